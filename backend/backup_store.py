@@ -0,0 +1,196 @@
+"""
+Content-addressed backup store for CV content revisions
+
+Each distinct version of cv_content.json is stored once as a blob named
+after its SHA-256, and an append-only index (one JSON record per line)
+lists the revisions in order. Recording a revision costs one blob write
+(skipped when the content is already stored) and one index append, no
+matter how many revisions are kept.
+
+Revisions are named r<seq>-<hash prefix>, where seq is a counter that
+only grows, so names stay unique however fast saves arrive.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from file_utils import append_durable, truncate_partial_line, write_atomic
+
+LEGACY_BACKUP_GLOB = "cv_content_backup_*.json"
+
+
+class BackupStore:
+    def __init__(self, backup_dir: Path, max_revisions: int = 200):
+        self.backup_dir = Path(backup_dir)
+        self.blob_dir = self.backup_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.backup_dir / "index.jsonl"
+        self.max_revisions = max_revisions
+
+        self._lock = threading.Lock()
+        # Revisions oldest first, and how many of them reference each blob
+        self._entries: List[Dict] = []
+        self._refcount: Dict[str, int] = {}
+        self._by_name: Dict[str, Dict] = {}
+        self._next_seq = 1
+        # Newest-first names, rebuilt only when the index changes
+        self._names: List[str] = []
+        # Whether the index is known to end with a complete record
+        self._index_tail_clean = False
+
+        if self.index_file.exists():
+            self._load_index()
+        self._migrate_legacy_backups()
+
+    def _load_index(self) -> None:
+        changed = False
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append: rewrite the
+                    # index without it, or the next append would be joined to it
+                    changed = True
+                    continue
+                if not (self.blob_dir / f"{entry['hash']}.json").exists():
+                    changed = True
+                    continue
+                
+                # Indexes written before revision ids existed used timestamp
+                # names, which collide within the same second
+                if "seq" not in entry:
+                    entry["seq"] = self._next_seq
+                    changed = True
+                if entry["name"] in self._by_name:
+                    entry["name"] = self._revision_name(entry["seq"], entry["hash"])
+                    changed = True
+                self._add_entry(entry)
+        
+        if self._prune() or changed:
+            self._rewrite_index()
+        self._names = [entry["name"] for entry in reversed(self._entries)]
+
+    def _migrate_legacy_backups(self) -> None:
+        """Move full-copy backups from older versions into the blob store"""
+        legacy = sorted(self.backup_dir.glob(LEGACY_BACKUP_GLOB))
+        for backup_file in legacy:
+            self.record(backup_file.read_bytes(), name=backup_file.name)
+            backup_file.unlink()
+
+    @staticmethod
+    def _revision_name(seq: int, digest: str) -> str:
+        return f"r{seq:06d}-{digest[:8]}"
+
+    def _add_entry(self, entry: Dict) -> None:
+        self._entries.append(entry)
+        self._by_name[entry["name"]] = entry
+        self._refcount[entry["hash"]] = self._refcount.get(entry["hash"], 0) + 1
+        self._next_seq = max(self._next_seq, entry["seq"] + 1)
+
+    def _prune(self) -> bool:
+        """Drop revisions beyond max_revisions and blobs no longer referenced"""
+        excess = len(self._entries) - self.max_revisions
+        if excess <= 0:
+            return False
+
+        for entry in self._entries[:excess]:
+            del self._by_name[entry["name"]]
+            digest = entry["hash"]
+            self._refcount[digest] -= 1
+            if self._refcount[digest] == 0:
+                del self._refcount[digest]
+                (self.blob_dir / f"{digest}.json").unlink(missing_ok=True)
+        del self._entries[:excess]
+        return True
+
+    def _rewrite_index(self) -> None:
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in self._entries)
+        write_atomic(self.index_file, data.encode('utf-8'))
+        self._index_tail_clean = True
+
+    def _append_index(self, entry: Dict) -> None:
+        # Checked once, and again after an append that failed part-way
+        if not self._index_tail_clean:
+            truncate_partial_line(self.index_file)
+            self._index_tail_clean = True
+        try:
+            append_durable(self.index_file, (json.dumps(entry, separators=(",", ":")) + "\n").encode('utf-8'))
+        except BaseException:
+            self._index_tail_clean = False
+            raise
+
+    def record(
+        self,
+        data: bytes,
+        name: Optional[str] = None,
+        version: Optional[int] = None,
+        updated_at: Optional[str] = None,
+    ) -> Optional[str]:
+        """Store a revision. Returns its name, or None if it equals the latest one.
+        
+        version and updated_at describe the stored content and are kept in
+        the index so the history can be listed without reading any blob.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            if self._entries and self._entries[-1]["hash"] == digest:
+                return None
+
+            blob_file = self.blob_dir / f"{digest}.json"
+            if digest not in self._refcount and not blob_file.exists():
+                write_atomic(blob_file, data)
+
+            seq = self._next_seq
+            if name is None or name in self._by_name:
+                name = self._revision_name(seq, digest)
+            entry = {
+                "name": name,
+                "seq": seq,
+                "hash": digest,
+                "size": len(data),
+                "version": version,
+                "updated_at": updated_at,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            self._add_entry(entry)
+
+            # The index only grows by appends; it is rewritten when pruning
+            # drops a batch of old revisions (every max_revisions / 10 saves)
+            if len(self._entries) > self.max_revisions + max(self.max_revisions // 10, 1):
+                self._prune()
+                self._rewrite_index()
+            else:
+                self._append_index(entry)
+
+            self._names = [name] + self._names[:self.max_revisions - 1]
+            return name
+
+    def names(self) -> List[str]:
+        """Revision names, newest first"""
+        return list(self._names)
+
+    def blob_bytes(self) -> int:
+        """Total size of the stored blobs (content kept by several revisions counts once)"""
+        with self._lock:
+            sizes = {entry["hash"]: entry.get("size", 0) for entry in self._entries}
+        return sum(sizes.values())
+
+    def entries(self) -> List[Dict]:
+        """Index records of the kept revisions, newest first"""
+        return [dict(self._by_name[name]) for name in self._names]
+
+    def read(self, name: str) -> bytes:
+        """Return the stored bytes of a revision"""
+        entry = self._by_name.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"Backup file not found: {name}")
+        return (self.blob_dir / f"{entry['hash']}.json").read_bytes()
@@ -0,0 +1,84 @@
+"""
+Structural diff between two versions of the CV content, used to preview
+an import before it replaces the current content
+"""
+
+from typing import Any, Callable, Dict, List
+
+from json_patch import escape_token, make_patch
+
+# List sections and the field that identifies their items
+KEYED_SECTIONS = {
+    "experiences": "id",
+    "education": "id",
+    "languages": "name",
+}
+
+# Sections compared field by field
+OBJECT_SECTIONS = ("personalInfo", "aboutDescription", "skills")
+
+
+def _changed_paths(old: Any, new: Any, path: str = "") -> List[str]:
+    """JSON pointers (below path) of everything that differs between old and new"""
+    return sorted({op["path"] for op in make_patch(old, new, path)})
+
+
+def _diff_keyed(old_items: list, new_items: list, key: Callable[[Any], Any]) -> Dict[str, Any]:
+    """Match list items by key instead of position"""
+    old_by_key = {key(item): item for item in old_items}
+    new_by_key = {key(item): item for item in new_items}
+
+    added = [k for k in new_by_key if k not in old_by_key]
+    removed = [k for k in old_by_key if k not in new_by_key]
+    changed = {
+        k: _changed_paths(old_by_key[k], item)
+        for k, item in new_by_key.items()
+        if k in old_by_key and old_by_key[k] != item
+    }
+    kept_old = [k for k in old_by_key if k in new_by_key]
+    kept_new = [k for k in new_by_key if k in old_by_key]
+
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "reordered": kept_old != kept_new,
+    }
+
+
+def _diff_object(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "added": [k for k in new if k not in old],
+        "removed": [k for k in old if k not in new],
+        "changed": {
+            k: _changed_paths(old[k], value, f"/{escape_token(k)}")
+            for k, value in new.items()
+            if k in old and old[k] != value
+        },
+    }
+
+
+def diff_content(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize what replacing old with new would change, section by section.
+
+    List items are matched by id (languages by name), so an edit to one
+    item is reported as a change to that item rather than as every later
+    item shifting. Only items that differ are compared in depth.
+    """
+    sections: Dict[str, Any] = {}
+
+    for section, field in KEYED_SECTIONS.items():
+        old_items, new_items = old.get(section) or [], new.get(section) or []
+        if old_items == new_items:
+            continue
+        sections[section] = _diff_keyed(
+            old_items, new_items,
+            lambda item: item.get(field) if isinstance(item, dict) else None
+        )
+
+    for section in OBJECT_SECTIONS:
+        old_value, new_value = old.get(section) or {}, new.get(section) or {}
+        if old_value != new_value:
+            sections[section] = _diff_object(old_value, new_value)
+
+    return {"has_changes": bool(sections), "sections": sections}
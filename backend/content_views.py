@@ -0,0 +1,91 @@
+"""
+Derived, read-only views of the CV content (built once per content
+version and cached by JSONStorage.get_view)
+"""
+
+from typing import Any, Dict, Optional
+
+SUPPORTED_LANGUAGES = ("en", "es", "fr")
+DEFAULT_LANGUAGE = "en"
+
+# Top-level fields of the content document (see models.content.ContentData)
+CONTENT_FIELDS = (
+    "id", "personalInfo", "experiences", "education", "skills",
+    "languages", "aboutDescription", "version", "updated_at",
+)
+
+# Sections served on their own, with the value used when one is missing
+SECTIONS = {
+    "experiences": [],
+    "education": [],
+    "skills": {},
+    "languages": [],
+}
+
+
+def parse_fields(fields: str) -> tuple:
+    """Parse a ?fields= list into a canonical (sorted, de-duplicated) tuple.
+    
+    Raises ValueError for unknown field names.
+    """
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names.difference(CONTENT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(names))
+
+
+def select_fields(content: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    """Sparse fieldset: only the requested top-level fields that exist"""
+    return {name: content[name] for name in fields if name in content}
+
+
+def negotiate_language(accept_language: Optional[str]) -> str:
+    """Pick the best supported language for an Accept-Language header"""
+    if not accept_language:
+        return DEFAULT_LANGUAGE
+
+    candidates = []
+    for position, part in enumerate(accept_language.split(",")):
+        tag, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        # "es-CO" counts as "es"; keep header order among equal q-values
+        language = tag.strip().lower().split("-")[0]
+        if quality > 0 and language in SUPPORTED_LANGUAGES:
+            candidates.append((-quality, position, language))
+
+    return min(candidates)[2] if candidates else DEFAULT_LANGUAGE
+
+
+def _pick(translations: Any, lang: str, default: Any) -> Any:
+    """Value for lang, falling back to English like the frontend does"""
+    if not isinstance(translations, dict):
+        return translations if translations is not None else default
+    value = translations.get(lang)
+    if not value:
+        value = translations.get(DEFAULT_LANGUAGE)
+    return value if value else default
+
+
+def project_language(content: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """Single-language document: translated fields are replaced by their lang value"""
+    document = dict(content)
+    document["lang"] = lang
+    document["aboutDescription"] = _pick(content.get("aboutDescription"), lang, "")
+
+    experiences = []
+    for experience in content.get("experiences", []):
+        item = {key: value for key, value in experience.items() if not key.startswith("period_")}
+        item["description"] = _pick(experience.get("description"), lang, [])
+        if lang != DEFAULT_LANGUAGE and experience.get(f"period_{lang}"):
+            item["period"] = experience[f"period_{lang}"]
+        experiences.append(item)
+    document["experiences"] = experiences
+
+    return document
@@ -0,0 +1,90 @@
+"""
+Crash-safe file writing helpers shared by the storage modules
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+
+def write_atomic(path: Path, data: bytes) -> Tuple[int, int, int]:
+    """Write data to path via a fsynced temp file and os.replace.
+    
+    Readers see either the old file or the complete new one, never a
+    truncated file. Returns the (inode, size, mtime) of the new file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+    
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def append_durable(path: Path, data: bytes) -> int:
+    """Append data to path and fsync it. Returns the new file size."""
+    with open(path, 'ab') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def truncate_partial_line(path: Path, chunk_size: int = 64 * 1024) -> int:
+    """Cut off a last line left without its newline by a crash mid-append.
+    
+    Anything appended after such a line would be glued onto it and lost
+    along with it. Returns the number of bytes removed.
+    """
+    try:
+        f = open(path, 'r+b')
+    except FileNotFoundError:
+        return 0
+    
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        
+        # Walk back to the newline ending the last complete line
+        end = size
+        keep = 0
+        while end > 0:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            end = start
+        
+        f.truncate(keep)
+        f.flush()
+        os.fsync(f.fileno())
+        return size - keep
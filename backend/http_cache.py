@@ -0,0 +1,128 @@
+"""
+Pre-rendered response bodies with strong ETags and compressed variants.
+Used by endpoints whose output only changes when the CV content changes.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+class CachedPayload:
+    """Response body rendered once, with lazily built gzip/brotli variants"""
+
+    def __init__(self, body: bytes, media_type: str = "application/json", compress: bool = True):
+        self.body = body
+        self.media_type = media_type
+        # False for formats that are already compressed (images, fonts...)
+        self.compress = compress
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._gzip: Optional[bytes] = None
+        self._brotli: Optional[bytes] = None
+
+    @classmethod
+    def from_json(cls, data: Any) -> "CachedPayload":
+        """Render data as compact UTF-8 JSON"""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body)
+
+    def gzip_body(self) -> bytes:
+        if self._gzip is None:
+            # mtime=0 keeps the output byte-identical across restarts
+            self._gzip = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzip
+
+    def brotli_body(self) -> Optional[bytes]:
+        if brotli is None:
+            return None
+        if self._brotli is None:
+            self._brotli = brotli.compress(self.body, quality=9)
+        return self._brotli
+
+    def encode_for(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Pick the best variant for an Accept-Encoding header"""
+        if not self.compress or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None
+
+        accepted = accepted_encodings(accept_encoding)
+        if "br" in accepted and brotli is not None:
+            return self.brotli_body(), "br"
+        if "gzip" in accepted:
+            return self.gzip_body(), "gzip"
+        return self.body, None
+
+
+def accepted_encodings(header: str) -> set:
+    """Encodings listed in an Accept-Encoding header with a non-zero q-value"""
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name)
+    return encodings
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 7232)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def if_match_matches(if_match: str, etag: str) -> bool:
+    """Strong comparison of an If-Match header against an ETag (RFC 7232)"""
+    if if_match.strip() == "*":
+        return True
+    return any(candidate.strip() == etag for candidate in if_match.split(","))
+
+
+def payload_response(
+    request: Request,
+    payload: CachedPayload,
+    cache_control: str = "no-cache",
+    vary: str = "Accept-Encoding",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serve a CachedPayload, answering conditional requests with 304"""
+    headers = {
+        **(headers or {}),
+        "ETag": payload.etag,
+        "Cache-Control": cache_control,
+        "Vary": vary,
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = payload.encode_for(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=payload.media_type, headers=headers)
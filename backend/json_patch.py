@@ -0,0 +1,211 @@
+"""
+Minimal JSON Patch (RFC 6902) support: diffing two documents and
+applying a patch, plus JSON Merge Patch (RFC 7396). Used by the storage
+journal to record edits compactly and by the PATCH content endpoints.
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+class PatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied"""
+
+
+class PatchTestFailed(PatchError):
+    """Raised when a 'test' operation does not match the document"""
+
+
+def escape_token(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def split_pointer(pointer: str) -> List[str]:
+    """Split a JSON pointer into its unescaped reference tokens"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [unescape_token(token) for token in pointer[1:].split("/")]
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Compute a patch that turns old into new"""
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{escape_token(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_token(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": copy.deepcopy(value)})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        return _diff_lists(old, new, path)
+
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(new)}]
+
+
+def _diff_lists(old: list, new: list, path: str) -> List[Dict[str, Any]]:
+    # Trim the common prefix and suffix so that inserting, deleting or
+    # editing one item only touches that item
+    start = 0
+    while start < len(old) and start < len(new) and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    old_middle = old[start:old_end]
+    new_middle = new[start:new_end]
+
+    if len(old_middle) == len(new_middle):
+        ops = []
+        for offset, (old_item, new_item) in enumerate(zip(old_middle, new_middle)):
+            ops.extend(make_patch(old_item, new_item, f"{path}/{start + offset}"))
+        return ops
+
+    # Remove from the back so earlier indexes stay valid, then insert
+    ops = [{"op": "remove", "path": f"{path}/{index}"} for index in range(old_end - 1, start - 1, -1)]
+    for offset, item in enumerate(new_middle):
+        ops.append({"op": "add", "path": f"{path}/{start + offset}", "value": copy.deepcopy(item)})
+    return ops
+
+
+def _resolve_parent(doc: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = split_pointer(pointer)
+    if not tokens:
+        raise PatchError("Operation cannot target the document root")
+    parent = doc
+    for token in tokens[:-1]:
+        parent = _get_child(parent, token, pointer)
+    return parent, tokens[-1]
+
+
+def _get_child(container: Any, token: str, pointer: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"Path not found: {pointer}")
+        return container[token]
+    if isinstance(container, list):
+        index = _list_index(container, token, pointer)
+        if index >= len(container):
+            raise PatchError(f"Path not found: {pointer}")
+        return container[index]
+    raise PatchError(f"Path not found: {pointer}")
+
+
+def _list_index(container: list, token: str, pointer: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid array index in {pointer}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range in {pointer}")
+    return index
+
+
+def get_pointer(doc: Any, pointer: str) -> Any:
+    """Return the value a JSON pointer refers to"""
+    value = doc
+    for token in split_pointer(pointer):
+        value = _get_child(value, token, pointer)
+    return value
+
+
+def _add(doc: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    parent, token = _resolve_parent(doc, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, pointer, allow_end=True), value)
+    else:
+        raise PatchError(f"Path not found: {pointer}")
+    return doc
+
+
+def _remove(doc: Any, pointer: str) -> Any:
+    parent, token = _resolve_parent(doc, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: {pointer}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, token, pointer))
+    raise PatchError(f"Path not found: {pointer}")
+
+
+def apply_patch(doc: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply a patch to doc in place and return the result.
+
+    The result is only the same object as doc when no operation replaces
+    the document root. On error doc may be partially patched, so callers
+    should patch a copy they can throw away.
+    """
+    if not isinstance(ops, list):
+        raise PatchError("A JSON patch must be a list of operations")
+
+    for op in ops:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise PatchError(f"Invalid patch operation: {op!r}")
+        name, path = op["op"], op["path"]
+
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"'{name}' operation requires a value")
+        if name in ("move", "copy") and "from" not in op:
+            raise PatchError(f"'{name}' operation requires 'from'")
+
+        if name == "add":
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif name == "remove":
+            _remove(doc, path)
+        elif name == "replace":
+            if path == "":
+                doc = copy.deepcopy(op["value"])
+            else:
+                get_pointer(doc, path)
+                _remove(doc, path)
+                doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif name == "move":
+            if path.startswith(op["from"] + "/"):
+                raise PatchError("Cannot move a value into one of its children")
+            value = _remove(doc, op["from"])
+            doc = _add(doc, path, value)
+        elif name == "copy":
+            doc = _add(doc, path, copy.deepcopy(get_pointer(doc, op["from"])))
+        elif name == "test":
+            if get_pointer(doc, path) != op["value"]:
+                raise PatchTestFailed(f"Test failed at {path}")
+        else:
+            raise PatchError(f"Unknown patch operation: {name}")
+
+    return doc
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a JSON Merge Patch (RFC 7396); dicts in target are updated in place"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), value)
+    return target
@@ -3,25 +3,108 @@ Simple JSON-based storage system for CV data
 Eliminates MongoDB dependency - all data stored in JSON files
 """
 
+import copy
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 from datetime import datetime
-import shutil
 import uuid
 
+from starlette.concurrency import run_in_threadpool
+
+from http_cache import CachedPayload, if_match_matches
+from file_utils import append_durable, truncate_partial_line, write_atomic
+from backup_store import BackupStore
+from json_patch import apply_patch, make_patch
+from metrics import CACHE_REQUESTS, STORAGE_LOAD, STORAGE_SAVE, registry
+
+JOURNAL_REVISION_PREFIX = "journal_rev_"
+
+# List sections whose items carry an id and can be addressed individually
+ITEM_SECTIONS = ("experiences", "education")
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+class PreconditionFailed(Exception):
+    """Raised when an If-Match ETag does not match the current content version"""
+
+
+class ConflictError(Exception):
+    """Raised when a mutation conflicts with existing content (e.g. a duplicate id)"""
+
+
+class NotFoundError(Exception):
+    """Raised when a mutation targets an item that does not exist"""
+
+
 class JSONStorage:
-    def __init__(self, data_dir: str = "/app/data"):
+    def __init__(
+        self,
+        data_dir: str = "/app/data",
+        max_backups: Optional[int] = None,
+        journal: Optional[bool] = None,
+        journal_max_entries: Optional[int] = None,
+        journal_max_bytes: Optional[int] = None,
+    ):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.content_file = self.data_dir / "cv_content.json"
+        
+        # Journal mode: edits are appended to cv_content.journal as JSON-patch
+        # records and folded into cv_content.json in the background once the
+        # journal grows past journal_max_entries or journal_max_bytes
+        self.journal_file = self.data_dir / "cv_content.journal"
+        self.journal_enabled = _env_flag("STORAGE_JOURNAL") if journal is None else journal
+        self.journal_max_entries = journal_max_entries or int(os.environ.get("JOURNAL_MAX_ENTRIES", "50"))
+        self.journal_max_bytes = journal_max_bytes or int(os.environ.get("JOURNAL_MAX_BYTES", str(256 * 1024)))
+        # Version of the snapshot file and the revisions replayed on top of it
+        self._journal_base_version = 0
+        self._journal_revs: list = []
+        self._compacting = False
+        # Whether the journal is known to end with a complete record
+        self._journal_tail_clean = False
+        # Set when replay stopped at a record it could not read or apply;
+        # records appended after it would never be replayed
+        self._journal_broken = False
         self.backup_dir = self.data_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        if max_backups is None:
+            max_backups = int(os.environ.get("MAX_BACKUPS", "200"))
+        self.backups = BackupStore(self.backup_dir, max_backups)
+        
+        # Parsed content snapshot, keyed by the (inode, size, mtime) of the file
+        # it was read from (plus the journal's, in journal mode). Swapped as a single tuple so readers never see a
+        # key paired with the wrong content.
+        self._cache: Optional[Tuple[Tuple[int, ...], Dict[str, Any]]] = None
+        self._cache_lock = threading.Lock()
+        
+        # Rendered views (full JSON, per-language projections, ...) of the
+        # snapshot they were built from
+        self._views: Optional[Tuple[Dict[str, Any], Dict[str, CachedPayload]]] = None
+        
+        # id -> position of the items in each of ITEM_SECTIONS, for the
+        # snapshot it was built from
+        self._item_index: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, int]]]] = None
+        
+        # Serializes every write; reentrant so locked helpers can call
+        # update_content() and friends
+        self.write_lock = threading.RLock()
+        
+        # Remove temp files left behind by a write interrupted mid-way
+        for stale in self.data_dir.glob(f".{self.content_file.name}.*.tmp"):
+            stale.unlink(missing_ok=True)
         
         # Initialize with default data if file doesn't exist
         if not self.content_file.exists():
             self._create_default_content()
+        elif not self.journal_enabled and self.journal_file.exists():
+            # Left over from running in journal mode: fold it into the snapshot
+            self.compact_journal()
     
     def _create_default_content(self):
         """Create default CV content"""
@@ -97,55 +180,452 @@ class JSONStorage:
         self._save_content(default_content)
     
     def _save_content(self, content: Dict[str, Any]) -> None:
-        """Save content to JSON file with backup"""
-        try:
-            # Create backup if file exists
-            if self.content_file.exists():
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_file = self.backup_dir / f"cv_content_backup_{timestamp}.json"
-                shutil.copy2(self.content_file, backup_file)
+        """Save content to JSON file with backup (or to the journal in journal mode)"""
+        with self.write_lock, STORAGE_SAVE.time():
+            try:
+                previous = self.peek_snapshot() if self.content_file.exists() else None
+                if previous is None and self.content_file.exists():
+                    previous = self.get_snapshot()
+                
+                # Update timestamp and bump the version, which must only ever grow
+                # (also across imports and restores of older content)
+                previous_version = previous.get("version", 0) if previous is not None else 0
+                content["version"] = max(content.get("version") or 0, previous_version) + 1
+                content["updated_at"] = datetime.utcnow().isoformat()
                 
-                # Keep only last 10 backups
-                backups = sorted(self.backup_dir.glob("cv_content_backup_*.json"))
-                if len(backups) > 10:
-                    for old_backup in backups[:-10]:
-                        old_backup.unlink()
+                if self.journal_enabled and previous is not None:
+                    self._append_journal(previous, content)
+                    return
+                
+                # Back up the version being replaced (skipped if already stored)
+                if self.content_file.exists():
+                    self.backups.record(
+                        self.content_file.read_bytes(),
+                        version=previous_version,
+                        updated_at=previous.get("updated_at") if previous is not None else None,
+                    )
             
-            # Update timestamp
-            content["updated_at"] = datetime.utcnow().isoformat()
+                # Save content atomically so concurrent readers never see a partial file
+                data = json.dumps(content, indent=2, ensure_ascii=False).encode('utf-8')
+                key = write_atomic(self.content_file, data)
+                if self.journal_enabled:
+                    # A full snapshot supersedes anything journaled before it
+                    self.journal_file.unlink(missing_ok=True)
+                    key = key + (0, 0, 0)
+                    self._journal_base_version = content["version"]
+                    self._journal_revs = []
             
-            # Save content
-            with open(self.content_file, 'w', encoding='utf-8') as f:
-                json.dump(content, f, indent=2, ensure_ascii=False)
+                # We just wrote this version, so seed the cache instead of
+                # re-reading it on the next request
+                self._cache = (key, copy.deepcopy(content))
                 
+            except Exception as e:
+                raise Exception(f"Error saving content: {str(e)}")
+    
+    def _append_journal(self, previous: Dict[str, Any], content: Dict[str, Any]) -> None:
+        """Record the change from previous to content as one journal line"""
+        record = {
+            "rev": content["version"],
+            "ts": content["updated_at"],
+            "ops": make_patch(previous, content),
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        
+        if self._journal_broken:
+            # Fold what replays cleanly into the snapshot and start a new
+            # journal, instead of appending after the record replay stops at
+            self.compact_journal()
+        
+        # A crash mid-append leaves a partial last line; appending after it
+        # would merge this record into that line and lose it on replay.
+        # Our own appends keep the tail clean, so this is checked once (and
+        # again after an append that failed part-way).
+        if not self._journal_tail_clean:
+            removed = truncate_partial_line(self.journal_file)
+            if removed:
+                print(f"Warning: Dropped {removed} bytes of an incomplete journal record")
+            self._journal_tail_clean = True
+        try:
+            journal_size = append_durable(self.journal_file, line.encode('utf-8'))
+        except BaseException:
+            self._journal_tail_clean = False
+            raise
+        
+        self._journal_revs.append(content["version"])
+        self._cache = (self._stat_key(), copy.deepcopy(content))
+        
+        if len(self._journal_revs) >= self.journal_max_entries or journal_size >= self.journal_max_bytes:
+            self._schedule_compaction()
+    
+    def _read_journal(self) -> Tuple[list, Tuple[int, int, int]]:
+        """Return the parsed journal records and the journal's stat key"""
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            return [], (0, 0, 0)
+        
+        with f:
+            # Only read what existed when we looked, so the key matches the data
+            st = os.fstat(f.fileno())
+            data = f.read(st.st_size)
+        
+        records = []
+        lines = data.split(b"\n")
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append is cut off by the
+                # next append; a bad complete line hides everything after it
+                if index < len(lines) - 1:
+                    self._journal_broken = True
+                break
+        return records, (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def _replay_journal(
+        self,
+        base: Dict[str, Any],
+        records: list,
+        up_to: Optional[int] = None,
+        on_revision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Tuple[Dict[str, Any], list]:
+        """Apply journal records newer than base, optionally stopping at a revision.
+        
+        Returns the resulting content and the revisions applied.
+        """
+        content = base
+        applied = []
+        for record in records:
+            if record["rev"] <= base.get("version", 0):
+                # Already folded into the snapshot by an interrupted compaction
+                continue
+            if up_to is not None and record["rev"] > up_to:
+                break
+            if content is base:
+                content = copy.deepcopy(base)
+            try:
+                content = apply_patch(content, record["ops"])
+            except ValueError as e:
+                print(f"Warning: Stopping journal replay at revision {record['rev']} ({e})")
+                self._journal_broken = True
+                # apply_patch may have changed part of the document before
+                # failing: rebuild it from the records that applied cleanly
+                content = copy.deepcopy(base)
+                for good in applied:
+                    content = apply_patch(content, good["ops"])
+                break
+            applied.append(record)
+            if on_revision is not None:
+                on_revision(content)
+        return content, [record["rev"] for record in applied]
+    
+    def _schedule_compaction(self) -> None:
+        if self._compacting:
+            return
+        self._compacting = True
+        threading.Thread(target=self._compact_in_background, name="journal-compaction", daemon=True).start()
+    
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact_journal()
         except Exception as e:
-            raise Exception(f"Error saving content: {str(e)}")
+            print(f"Warning: Journal compaction failed ({e})")
+        finally:
+            self._compacting = False
     
-    def load_content(self) -> Dict[str, Any]:
-        """Load content from JSON file"""
+    def compact_journal(self) -> None:
+        """Fold the journal into cv_content.json.
+        
+        Every revision the journal held (and the old snapshot itself) is
+        archived in the backup store first, so history survives compaction.
+        """
+        with self.write_lock:
+            if not self.journal_file.exists():
+                self._journal_broken = False
+                return
+            
+            base_data = self.content_file.read_bytes()
+            base = json.loads(base_data)
+            records, _ = self._read_journal()
+            
+            # Archive each revision once the next one replaces it; the last
+            # one becomes the new snapshot
+            previous = [base_data, base.get("version"), base.get("updated_at")]
+            
+            def archive(revision: Dict[str, Any]) -> None:
+                self.backups.record(previous[0], version=previous[1], updated_at=previous[2])
+                previous[:] = [
+                    json.dumps(revision, indent=2, ensure_ascii=False).encode('utf-8'),
+                    revision.get("version"),
+                    revision.get("updated_at"),
+                ]
+            
+            content, _ = self._replay_journal(base, records, on_revision=archive)
+            data = previous[0]
+            key = write_atomic(self.content_file, data)
+            if self._journal_broken:
+                print("Warning: Discarding journal records after one that could not be replayed")
+            self.journal_file.unlink(missing_ok=True)
+            self._journal_broken = False
+            
+            self._journal_base_version = content.get("version", 0)
+            self._journal_revs = []
+            if self.journal_enabled:
+                key = key + (0, 0, 0)
+            
+            # Same content as before: keep the cached object (and its
+            # pre-rendered payload) and only refresh the key
+            cached = self._cache
+            if cached is not None and cached[1] == content:
+                content = cached[1]
+            self._cache = (key, content)
+    
+    def _stat_key(self) -> Optional[Tuple[int, ...]]:
+        """Identity of the content file (and journal) on disk, or None if missing"""
         try:
-            if not self.content_file.exists():
+            st = os.stat(self.content_file)
+        except FileNotFoundError:
+            return None
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self.journal_enabled:
+            try:
+                jst = os.stat(self.journal_file)
+                key = key + (jst.st_ino, jst.st_size, jst.st_mtime_ns)
+            except FileNotFoundError:
+                key = key + (0, 0, 0)
+        return key
+    
+    def peek_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Return the cached content if it is still current, without reading the file"""
+        key = self._stat_key()
+        cached = self._cache
+        if cached is not None and key is not None and cached[0] == key:
+            CACHE_REQUESTS.inc("snapshot", "hit")
+            return cached[1]
+        CACHE_REQUESTS.inc("snapshot", "miss")
+        return None
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Return the cached, parsed content, re-reading the file only if it changed.
+        
+        The returned dict is shared between callers and must not be mutated;
+        use load_content() for a private copy.
+        """
+        snapshot = self.peek_snapshot()
+        if snapshot is not None:
+            return snapshot
+        
+        error: Optional[Exception] = None
+        with self._cache_lock:
+            # Another thread may have refreshed the cache while we waited
+            key = self._stat_key()
+            cached = self._cache
+            if cached is not None and key is not None and cached[0] == key:
+                return cached[1]
+            
+            if key is not None:
+                try:
+                    with open(self.content_file, 'r', encoding='utf-8') as f, STORAGE_LOAD.time():
+                        # Key the snapshot on the file we actually read
+                        st = os.fstat(f.fileno())
+                        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+                        content = json.load(f)
+                except FileNotFoundError:
+                    key = None
+                except Exception as e:
+                    error = e
+                else:
+                    if self.journal_enabled:
+                        self._journal_base_version = content.get("version", 0)
+                        records, journal_key = self._read_journal()
+                        content, self._journal_revs = self._replay_journal(content, records)
+                        key = key + journal_key
+                    
+                    self._cache = (key, content)
+                    return content
+        
+        # Creating or replacing the file saves content, which takes
+        # write_lock. Writers hold write_lock while they take _cache_lock,
+        # so that must happen only after _cache_lock is released.
+        with self.write_lock:
+            snapshot = self.peek_snapshot()
+            if snapshot is not None:
+                # Another thread recovered (or wrote) meanwhile
+                return snapshot
+            if error is None and not self.content_file.exists():
                 self._create_default_content()
+                return self._cache[1]
+            if error is None:
+                return self.get_snapshot()
+            return self._recover_unreadable(error)
+    
+    def _recover_unreadable(self, error: Exception) -> Dict[str, Any]:
+        """Handle a content file that exists but cannot be parsed (called holding write_lock)"""
+        cached = self._cache
+        if cached is not None:
+            # Keep serving the last good version rather than discarding it
+            print(f"Warning: Error loading content ({error}), keeping last good version")
+            return cached[1]
+        
+        # Nothing to fall back to: set the broken file aside for inspection
+        # and start from the default content
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        corrupt_file = self.data_dir / f"cv_content.corrupt_{timestamp}.json"
+        print(f"Warning: Error loading content ({error}), moved to {corrupt_file.name}, creating default content")
+        try:
+            os.replace(self.content_file, corrupt_file)
+        except OSError:
+            pass
+        self._create_default_content()
+        return self._cache[1]
+    
+    def peek_view(self, key: str) -> Optional[CachedPayload]:
+        """Return a cached view of the current content, without any I/O beyond a stat"""
+        snapshot = self.peek_snapshot()
+        views = self._views
+        if snapshot is not None and views is not None and views[0] is snapshot:
+            payload = views[1].get(key)
+            if payload is not None:
+                CACHE_REQUESTS.inc("view", "hit")
+            return payload
+        return None
+    
+    def get_view(self, key: str, build: Callable[[Dict[str, Any]], CachedPayload]) -> CachedPayload:
+        """Return a rendered view of the current content, building it once per version.
+        
+        build receives the (shared, read-only) snapshot; key must identify
+        everything besides the content that the output depends on.
+        """
+        snapshot = self.get_snapshot()
+        views = self._views
+        if views is None or views[0] is not snapshot:
+            views = (snapshot, {})
+            self._views = views
+        
+        payload = views[1].get(key)
+        if payload is None:
+            CACHE_REQUESTS.inc("view", "miss")
+            payload = build(snapshot)
+            views[1][key] = payload
+        else:
+            CACHE_REQUESTS.inc("view", "hit")
+        return payload
+    
+    def peek_rendered(self) -> Optional[CachedPayload]:
+        """Return the pre-rendered content if it is still current, without any I/O beyond a stat"""
+        return self.peek_view("content")
+    
+    def get_rendered(self) -> CachedPayload:
+        """Return the current content pre-rendered as JSON, built once per version"""
+        return self.get_view("content", CachedPayload.from_json)
+    
+    def load_content(self) -> Dict[str, Any]:
+        """Load content from JSON file (returns a copy the caller may modify)"""
+        return copy.deepcopy(self.get_snapshot())
+    
+    def current_etag(self) -> str:
+        """ETag of the current content version"""
+        return self.get_rendered().etag
+    
+    def check_precondition(self, if_match: Optional[str]) -> None:
+        """Raise PreconditionFailed unless If-Match matches the current version"""
+        if if_match is None:
+            return
+        if not if_match_matches(if_match, self.current_etag()):
+            raise PreconditionFailed("Content was modified by another request")
+    
+    def mutate(self, fn: Callable[[Dict[str, Any]], Any], if_match: Optional[str] = None) -> Dict[str, Any]:
+        """Apply fn to a private copy of the content and save it, under the write lock.
+        
+        This is a single read-modify-write: one load, one in-place mutation
+        by fn, one save. fn may raise to abort without writing anything, and
+        a mutation that leaves the content unchanged is not written at all.
+        Returns the resulting content.
+        """
+        with self.write_lock:
+            self.check_precondition(if_match)
+            snapshot = self.get_snapshot()
+            content = copy.deepcopy(snapshot)
+            fn(content)
             
-            with open(self.content_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            # If file is corrupted, create default content
-            print(f"Warning: Error loading content ({e}), creating default content")
-            self._create_default_content()
-            return self.load_content()
+            # Nothing changed: no new version, no write, no backup
+            if content == snapshot:
+                return content
+            
+            self._save_content(content)
+            return content
     
-    def update_content(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+    def update_content(self, updates: Dict[str, Any], if_match: Optional[str] = None) -> Dict[str, Any]:
         """Update specific fields in content"""
-        current_content = self.load_content()
+        def apply_updates(content: Dict[str, Any]) -> None:
+            # Update only provided fields
+            for key, value in updates.items():
+                if value is not None:
+                    content[key] = value
         
-        # Update only provided fields
-        for key, value in updates.items():
-            if value is not None:
-                current_content[key] = value
+        return self.mutate(apply_updates, if_match)
+    
+    def _item_positions(self, snapshot: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        """id -> position maps of snapshot's item sections, built once per version"""
+        index = self._item_index
+        if index is None or index[0] is not snapshot:
+            positions: Dict[str, Dict[str, int]] = {}
+            for section in ITEM_SECTIONS:
+                section_positions = positions[section] = {}
+                for position, item in enumerate(snapshot.get(section) or []):
+                    if isinstance(item, dict) and "id" in item:
+                        # Should ids ever repeat, the first item wins, as with a scan
+                        section_positions.setdefault(item["id"], position)
+            index = (snapshot, positions)
+            self._item_index = index
+        return index[1]
+    
+    def item_position(self, section: str, item_id: str) -> int:
+        """Position of an item in the current content; NotFoundError if there is none"""
+        position = self._item_positions(self.get_snapshot())[section].get(item_id)
+        if position is None:
+            raise NotFoundError(f"No item with id {item_id} in {section}")
+        return position
+    
+    def get_item(self, section: str, item_id: str) -> Dict[str, Any]:
+        """Return a copy of one item of an item section"""
+        snapshot = self.get_snapshot()
+        return copy.deepcopy(snapshot[section][self.item_position(section, item_id)])
+    
+    def add_item(self, section: str, item: Dict[str, Any], if_match: Optional[str] = None) -> Dict[str, Any]:
+        """Append an item; ConflictError if its id is already taken"""
+        def add(content: Dict[str, Any]) -> None:
+            if item["id"] in self._item_positions(self.get_snapshot())[section]:
+                raise ConflictError(f"An item with id {item['id']} already exists in {section}")
+            content[section].append(item)
+        
+        return self.mutate(add, if_match)
+    
+    def mutate_item(
+        self,
+        section: str,
+        item_id: str,
+        fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+        if_match: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Replace one item with fn(private copy of it); returns the new item and content"""
+        result = {}
+        
+        def apply(content: Dict[str, Any]) -> None:
+            position = self.item_position(section, item_id)
+            content[section][position] = result["item"] = fn(content[section][position])
+        
+        content = self.mutate(apply, if_match)
+        return result["item"], content
+    
+    def delete_item(self, section: str, item_id: str, if_match: Optional[str] = None) -> Dict[str, Any]:
+        """Remove one item; NotFoundError if there is none"""
+        def delete(content: Dict[str, Any]) -> None:
+            del content[section][self.item_position(section, item_id)]
         
-        self._save_content(current_content)
-        return current_content
+        return self.mutate(delete, if_match)
     
     def import_content(self, new_content: Dict[str, Any]) -> Dict[str, Any]:
         """Import complete content (for JSON import feature)"""
@@ -162,26 +642,161 @@ class JSONStorage:
         self._save_content(new_content)
         return new_content
     
+    def reset_to_default(self) -> Dict[str, Any]:
+        """Replace current content with the default CV (current content is backed up)"""
+        with self.write_lock:
+            self._create_default_content()
+            return self.get_snapshot()
+    
     def export_content(self) -> Dict[str, Any]:
         """Export current content"""
         return self.load_content()
     
     def get_backups(self) -> list:
-        """Get list of available backups"""
-        backups = sorted(self.backup_dir.glob("cv_content_backup_*.json"), reverse=True)
-        return [backup.name for backup in backups]
+        """Get list of available backups, newest first"""
+        if not self.journal_enabled:
+            return self.backups.names()
+        
+        # Earlier revisions still held in the journal come first; the
+        # latest revision is the current content, not a backup
+        self.get_snapshot()
+        revs = [self._journal_base_version] + self._journal_revs[:-1] if self._journal_revs else []
+        journal_names = [f"{JOURNAL_REVISION_PREFIX}{rev}" for rev in reversed(revs)]
+        return journal_names + self.backups.names()
     
-    def restore_backup(self, backup_name: str) -> Dict[str, Any]:
-        """Restore from backup"""
-        backup_file = self.backup_dir / backup_name
-        if not backup_file.exists():
+    def get_backup_history(self) -> list:
+        """Index records (name, version, updated_at, size...) of stored backups, newest first"""
+        return self.backups.entries()
+    
+    def _read_journal_revision(self, backup_name: str) -> Dict[str, Any]:
+        try:
+            rev = int(backup_name[len(JOURNAL_REVISION_PREFIX):])
+        except ValueError:
             raise FileNotFoundError(f"Backup file not found: {backup_name}")
         
-        with open(backup_file, 'r', encoding='utf-8') as f:
-            backup_content = json.load(f)
+        with self.write_lock:
+            self.get_snapshot()
+            if rev != self._journal_base_version and rev not in self._journal_revs:
+                raise FileNotFoundError(f"Backup file not found: {backup_name}")
+            with open(self.content_file, 'r', encoding='utf-8') as f:
+                base = json.load(f)
+            records, _ = self._read_journal()
+            content, _ = self._replay_journal(base, records, up_to=rev)
+            return content
+    
+    def restore_backup(self, backup_name: str) -> Dict[str, Any]:
+        """Restore from backup"""
+        if self.journal_enabled and backup_name.startswith(JOURNAL_REVISION_PREFIX):
+            backup_content = self._read_journal_revision(backup_name)
+        else:
+            backup_content = json.loads(self.backups.read(backup_name))
         
         self._save_content(backup_content)
         return backup_content
 
-# Global storage instance
-storage = JSONStorage()
\ No newline at end of file
+
+
+class AsyncJSONStorage:
+    """Awaitable facade over JSONStorage for use inside async route handlers.
+    
+    Cache hits are answered inline (a single stat); anything that reads,
+    writes or copies files runs in the threadpool so the event loop keeps
+    serving other requests while an admin save is in progress.
+    """
+    
+    def __init__(self, sync_storage: JSONStorage):
+        self.sync = sync_storage
+    
+    @property
+    def content_file(self) -> Path:
+        return self.sync.content_file
+    
+    @property
+    def backup_dir(self) -> Path:
+        return self.sync.backup_dir
+    
+    async def get_snapshot(self) -> Dict[str, Any]:
+        snapshot = self.sync.peek_snapshot()
+        if snapshot is not None:
+            return snapshot
+        return await run_in_threadpool(self.sync.get_snapshot)
+    
+    async def get_rendered(self) -> CachedPayload:
+        payload = self.sync.peek_rendered()
+        if payload is not None:
+            return payload
+        return await run_in_threadpool(self.sync.get_rendered)
+    
+    async def get_view(self, key: str, build: Callable[[Dict[str, Any]], CachedPayload]) -> CachedPayload:
+        payload = self.sync.peek_view(key)
+        if payload is not None:
+            return payload
+        return await run_in_threadpool(self.sync.get_view, key, build)
+    
+    async def load_content(self) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.load_content)
+    
+    async def current_etag(self) -> str:
+        return (await self.get_rendered()).etag
+    
+    async def mutate(self, fn: Callable[[Dict[str, Any]], Any], if_match: Optional[str] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.mutate, fn, if_match)
+    
+    async def get_item(self, section: str, item_id: str) -> Dict[str, Any]:
+        if self.sync.peek_snapshot() is not None:
+            return self.sync.get_item(section, item_id)
+        return await run_in_threadpool(self.sync.get_item, section, item_id)
+    
+    async def add_item(self, section: str, item: Dict[str, Any], if_match: Optional[str] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.add_item, section, item, if_match)
+    
+    async def mutate_item(
+        self,
+        section: str,
+        item_id: str,
+        fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+        if_match: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        return await run_in_threadpool(self.sync.mutate_item, section, item_id, fn, if_match)
+    
+    async def delete_item(self, section: str, item_id: str, if_match: Optional[str] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.delete_item, section, item_id, if_match)
+    
+    async def update_content(self, updates: Dict[str, Any], if_match: Optional[str] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.update_content, updates, if_match)
+    
+    async def import_content(self, new_content: Dict[str, Any]) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.import_content, new_content)
+    
+    async def reset_to_default(self) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.reset_to_default)
+    
+    async def export_content(self) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.export_content)
+    
+    async def get_backups(self) -> list:
+        return await run_in_threadpool(self.sync.get_backups)
+    
+    async def get_backup_history(self) -> list:
+        return self.sync.get_backup_history()
+    
+    async def restore_backup(self, backup_name: str) -> Dict[str, Any]:
+        return await run_in_threadpool(self.sync.restore_backup, backup_name)
+
+# Global storage instances
+storage = JSONStorage(os.environ.get("DATA_DIR", "/app/data"))
+async_storage = AsyncJSONStorage(storage)
+
+# Read when /metrics is scraped
+registry.gauge(
+    "storage_backup_revisions", "Backup revisions kept",
+    collect=lambda: len(storage.backups.names()))
+registry.gauge(
+    "storage_backup_bytes", "Size of the stored backup blobs",
+    collect=storage.backups.blob_bytes)
+registry.gauge(
+    "storage_content_bytes", "Size of the content file",
+    collect=lambda: storage.content_file.stat().st_size)
+registry.gauge(
+    "storage_content_version", "Version of the current content",
+    collect=lambda: (storage._cache or (None, {}))[1].get("version", 0))
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Incremental JSON reading from a binary file, one value at a time
+
+The outer object and arrays of a document are walked piece by piece and
+each member is decoded with the stdlib decoder, so a large file is never
+held in memory as a whole (neither as bytes nor as a decoded str) and
+can be rejected as soon as one of its pieces is found to be invalid.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Iterator, Optional
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONStreamError(ValueError):
+    """Raised when the document is not valid JSON"""
+
+
+class StreamTooLarge(Exception):
+    """Raised when more than the reader's limit has been read"""
+
+
+class JSONStreamReader:
+    """Reads a JSON document from a binary file in chunks.
+
+    iter_object() and iter_array() yield once per member and the caller
+    consumes each member (with read_value() or a nested iter_*) before
+    asking for the next one. Only the member being decoded is buffered.
+    """
+
+    def __init__(self, file: BinaryIO, limit: Optional[int] = None, chunk_size: int = 64 * 1024):
+        self.file = file
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        # utf-8-sig drops the byte order mark some editors write
+        self._text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # Characters dropped from the front of the buffer, for error positions
+        self._offset = 0
+        self._eof = False
+
+    def _error(self, message: str, pos: Optional[int] = None) -> JSONStreamError:
+        position = self._offset + (self._pos if pos is None else pos)
+        return JSONStreamError(f"{message} (char {position})")
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer. Returns False at end of file."""
+        if self._eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if self.limit is not None and self.bytes_read > self.limit:
+            raise StreamTooLarge(f"More than {self.limit} bytes")
+        text = self._text_decoder.decode(chunk, final=not chunk)
+        self._eof = not chunk
+
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ("" at end of file)"""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str, message: str) -> None:
+        if self.peek() != char:
+            raise self._error(message)
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete value"""
+        if self.peek() == "":
+            raise self._error("Expecting value")
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Most likely cut off at the end of the buffer
+                if self._eof:
+                    raise self._error(e.msg, e.pos) from None
+            else:
+                # A number ending the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+
+            # Read until the pending text doubles, so a value spanning many
+            # chunks is decoded a logarithmic number of times
+            wanted = max(2 * (len(self._buffer) - self._pos), self.chunk_size)
+            while len(self._buffer) - self._pos < wanted and self._fill():
+                pass
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of an object; the caller reads each value"""
+        self._expect("{", "Expecting '{'")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("Expecting property name enclosed in double quotes")
+            key = self.read_value()
+            self._expect(":", "Expecting ':' delimiter")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("Expecting ',' delimiter", self._pos - 1)
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield the index of each array element; the caller reads each element"""
+        self._expect("[", "Expecting '['")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error("Expecting ',' delimiter", self._pos - 1)
+
+    def skip_value(self) -> None:
+        """Consume the next value without keeping it (arrays and objects member by member)"""
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def end(self) -> None:
+        """Check that nothing but whitespace follows the document"""
+        if self.peek() != "":
+            raise self._error("Extra data")
@@ -1,11 +1,23 @@
 from pydantic import BaseModel
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import hashlib
+import hmac
 import secrets
 import os
 from datetime import datetime, timedelta
 import jwt
 
+from token_cache import VerifiedTokenCache
+
+# PBKDF2 is deliberately slow; run it on a small dedicated pool so logins
+# never block the event loop or starve the threadpool used for storage I/O
+_password_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("LOGIN_WORKERS", "2")),
+    thread_name_prefix="password-verify"
+)
+
 class AdminCredentials(BaseModel):
     username: str
     password: str
@@ -21,6 +33,7 @@ class AuthManager:
         self.admin_username = os.environ.get('ADMIN_USERNAME', 'admin')
         self.admin_password_hash = os.environ.get('ADMIN_PASSWORD_HASH', self._hash_password('admin2024'))
         self.jwt_secret = os.environ.get('JWT_SECRET', secrets.token_urlsafe(32))
+        self.token_cache = VerifiedTokenCache(int(os.environ.get('TOKEN_CACHE_SIZE', '256')))
         
     def _hash_password(self, password: str) -> str:
         """Hash password with salt"""
@@ -33,7 +46,7 @@ class AuthManager:
         try:
             salt, stored_hash = password_hash.split(':')
             password_hash_check = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return stored_hash == password_hash_check.hex()
+            return hmac.compare_digest(stored_hash, password_hash_check.hex())
         except:
             return False
     
@@ -46,22 +59,39 @@ class AuthManager:
         }
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
     
-    def verify_token(self, token: str) -> Optional[str]:
-        """Verify JWT token and return username"""
+    def decode_token(self, token: str) -> Optional[dict]:
+        """Verify JWT token and return its payload (cached until the token expires)"""
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=['HS256'])
-            return payload.get('username')
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        self.token_cache.put(token, payload)
+        return payload
+    
+    def verify_token(self, token: str) -> Optional[str]:
+        """Verify JWT token and return username"""
+        payload = self.decode_token(token)
+        return payload.get('username') if payload else None
     
     def authenticate(self, username: str, password: str) -> Optional[AuthToken]:
         """Authenticate user and return token"""
-        if username == self.admin_username and self.verify_password(password, self.admin_password_hash):
+        # Always run the hash check so a wrong username takes as long as a wrong password
+        username_ok = hmac.compare_digest(username.encode(), self.admin_username.encode())
+        password_ok = self.verify_password(password, self.admin_password_hash)
+        if username_ok and password_ok:
             access_token = self.create_access_token(username)
             return AuthToken(access_token=access_token)
         return None
 
+    async def authenticate_async(self, username: str, password: str) -> Optional[AuthToken]:
+        """authenticate() on the password worker pool, for use from async handlers"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, self.authenticate, username, password)
+
 # Global auth manager instance
 auth_manager = AuthManager()
\ No newline at end of file
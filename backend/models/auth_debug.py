@@ -1,11 +1,30 @@
 from pydantic import BaseModel
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import hashlib
+import hmac
 import secrets
 import os
 from datetime import datetime, timedelta
 import jwt
 
+from token_cache import VerifiedTokenCache
+
+# PBKDF2 is deliberately slow; run it on a small dedicated pool so logins
+# never block the event loop or starve the threadpool used for storage I/O
+_password_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("LOGIN_WORKERS", "2")),
+    thread_name_prefix="password-verify"
+)
+
+def _matches_any(password: str, candidates: list) -> bool:
+    """Constant-time membership test (checks every candidate)"""
+    matched = False
+    for candidate in candidates:
+        matched |= hmac.compare_digest(password.encode(), candidate.encode())
+    return matched
+
 class AdminCredentials(BaseModel):
     username: str
     password: str
@@ -21,6 +40,7 @@ class AuthManager:
         self.admin_username = os.environ.get('ADMIN_USERNAME', 'admin')
         self.admin_password_hash = os.environ.get('ADMIN_PASSWORD_HASH', self._hash_password('admin'))
         self.jwt_secret = os.environ.get('JWT_SECRET', secrets.token_urlsafe(32))
+        self.token_cache = VerifiedTokenCache(int(os.environ.get('TOKEN_CACHE_SIZE', '256')))
         
         # Lista de contraseñas válidas para debug
         self.valid_passwords = ['Vp12345!']
@@ -36,7 +56,7 @@ class AuthManager:
         try:
             salt, stored_hash = password_hash.split(':')
             password_hash_check = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return stored_hash == password_hash_check.hex()
+            return hmac.compare_digest(stored_hash, password_hash_check.hex())
         except:
             return False
     
@@ -49,39 +69,56 @@ class AuthManager:
         }
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
     
-    def verify_token(self, token: str) -> Optional[str]:
-        """Verify JWT token and return username"""
+    def decode_token(self, token: str) -> Optional[dict]:
+        """Verify JWT token and return its payload (cached until the token expires)"""
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=['HS256'])
-            return payload.get('username')
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        self.token_cache.put(token, payload)
+        return payload
+    
+    def verify_token(self, token: str) -> Optional[str]:
+        """Verify JWT token and return username"""
+        payload = self.decode_token(token)
+        return payload.get('username') if payload else None
     
     def authenticate(self, username: str, password: str) -> Optional[AuthToken]:
         """Authenticate user and return token - WITH DEBUG OPTIONS"""
         
-        # Check if username matches
-        if username != self.admin_username:
-            return None
+        # Check if username matches (the hash check below still runs, so a
+        # wrong username takes as long as a wrong password)
+        username_ok = hmac.compare_digest(username.encode(), self.admin_username.encode())
         
         # Method 1: Check against stored hash
-        if self.verify_password(password, self.admin_password_hash):
+        if self.verify_password(password, self.admin_password_hash) and username_ok:
             access_token = self.create_access_token(username)
             return AuthToken(access_token=access_token)
         
+        if not username_ok:
+            return None
+        
         # Method 2: Check against debug password list (TEMP FOR DEBUG)
-        if password in self.valid_passwords:
+        if _matches_any(password, self.valid_passwords):
             access_token = self.create_access_token(username)
             return AuthToken(access_token=access_token)
         
         # Method 3: Simple hardcoded check for emergency access
-        if username == 'admin' and password in ['admin', '123', 'debug']:
+        if username == 'admin' and _matches_any(password, ['admin', '123', 'debug']):
             access_token = self.create_access_token(username)
             return AuthToken(access_token=access_token)
         
         return None
 
+    async def authenticate_async(self, username: str, password: str) -> Optional[AuthToken]:
+        """authenticate() on the password worker pool, for use from async handlers"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, self.authenticate, username, password)
+
 # Global auth manager instance
 auth_manager = AuthManager()
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, model_validator
+from typing import Any, List, Dict, Literal, Optional
 from datetime import datetime
 import uuid
 
@@ -45,6 +45,7 @@ class ContentData(BaseModel):
     skills: Dict[str, List[str]]
     languages: List[LanguageItem]
     aboutDescription: Dict[str, str]  # {lang: description}
+    version: int = 0  # bumped on every save
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ContentUpdate(BaseModel):
@@ -53,4 +54,190 @@ class ContentUpdate(BaseModel):
     education: Optional[List[EducationItem]] = None
     skills: Optional[Dict[str, List[str]]] = None
     languages: Optional[List[LanguageItem]] = None
-    aboutDescription: Optional[Dict[str, str]] = None
\ No newline at end of file
+    aboutDescription: Optional[Dict[str, str]] = None
+
+class BatchOperation(BaseModel):
+    op: Literal["add", "update", "delete", "reorder"]
+    section: Literal["experiences", "education"]
+    id: Optional[str] = None  # update, delete
+    item: Optional[Dict[str, Any]] = None  # add (full item), update (merge patch)
+    ids: Optional[List[str]] = None  # reorder: every id of the section, in the new order
+    
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        required = {
+            "add": ("item",),
+            "update": ("id", "item"),
+            "delete": ("id",),
+            "reorder": ("ids",),
+        }[self.op]
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"'{self.op}' requires {' and '.join(missing)}")
+        return self
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+# Item model for each list section of the content
+SECTION_ITEM_MODELS = {
+    "experiences": ExperienceItem,
+    "education": EducationItem,
+    "languages": LanguageItem,
+}
+
+# Fields of ContentUpdate, validated by normalize_section()
+UPDATABLE_FIELDS = ("personalInfo", "experiences", "education", "skills", "languages", "aboutDescription")
+
+# Maintained by storage, never set by clients
+READ_ONLY_FIELDS = ("version", "updated_at")
+
+def normalize_section(name: str, value: Any) -> Any:
+    """Validate one top-level content field and return it in stored form.
+    
+    Raises ValueError (pydantic's ValidationError is one) if it is invalid.
+    """
+    if name in READ_ONLY_FIELDS:
+        raise ValueError(f"Field is read-only: {name}")
+    if name == "id":
+        if not isinstance(value, str):
+            raise ValueError("id must be a string")
+        return value
+    if name not in UPDATABLE_FIELDS:
+        raise ValueError(f"Unknown field: {name}")
+    
+    validated = getattr(ContentUpdate(**{name: value}), name)
+    if validated is None:
+        raise ValueError(f"Field cannot be null: {name}")
+    if isinstance(validated, list):
+        return [item.dict() for item in validated]
+    if isinstance(validated, BaseModel):
+        return validated.dict()
+    return validated
+
+def normalize_item(section: str, value: Any) -> Dict[str, Any]:
+    """Validate one item of a list section and return it in stored form"""
+    if not isinstance(value, dict):
+        raise ValueError(f"{section} items must be objects")
+    return SECTION_ITEM_MODELS[section](**value).dict()
+
+# Translated periods that fall back to "period" when an import leaves them out
+TRANSLATED_PERIODS = ("period_es", "period_fr")
+
+class ContentValidationError(ValueError):
+    """Schema problems found in a content document, as "path: message" lines"""
+    
+    def __init__(self, messages: List[str]):
+        super().__init__("; ".join(messages))
+        self.messages = messages
+
+def _located(prefix: str, error: ValidationError) -> List[str]:
+    """Error lines of a piece of the document, with their path below prefix"""
+    return [
+        f"{'.'.join([prefix, *(str(part) for part in err['loc'])])}: {err['msg']}"
+        for err in error.errors()
+    ]
+
+def _finish_content(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Checks and defaults applied to a validated document as a whole"""
+    duplicates = []
+    for section in ("experiences", "education"):
+        seen = set()
+        for index, item in enumerate(content[section]):
+            if item["id"] in seen:
+                duplicates.append(f"{section}.{index}.id: Duplicate id {item['id']}")
+            seen.add(item["id"])
+    if duplicates:
+        raise ContentValidationError(duplicates)
+    
+    for experience in content["experiences"]:
+        for field in TRANSLATED_PERIODS:
+            if not experience.get(field):
+                experience[field] = experience["period"]
+    return content
+
+def validate_content(data: Any) -> Dict[str, Any]:
+    """Validate a complete CV document (e.g. an import) and return it in stored form.
+    
+    Missing ids are generated, missing translated periods are filled in
+    from "period" and unknown fields are dropped. Raises pydantic's
+    ValidationError, or ContentValidationError for duplicate ids, listing
+    the problems found.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Content must be a JSON object")
+    
+    # One pass through pydantic's validator, built once when the model
+    # class is defined, checks the whole document
+    content = ContentData(**data).dict(exclude={"updated_at"})
+    return _finish_content(content)
+
+# Validators for the pieces of a document checked one at a time, built once
+_FIELD_ADAPTERS = {
+    name: TypeAdapter(field.annotation)
+    for name, field in ContentData.model_fields.items()
+    if name != "updated_at"
+}
+_ITEM_ADAPTERS = {section: TypeAdapter(model) for section, model in SECTION_ITEM_MODELS.items()}
+
+class ContentValidator:
+    """Validates a CV document one field or list item at a time, as it is parsed.
+    
+    Each piece is checked as soon as it is complete, so the first schema
+    violation stops e.g. a streamed import (ContentValidationError) before
+    the rest is read. finish() returns the same stored form as
+    validate_content().
+    """
+    
+    def __init__(self):
+        self.content: Dict[str, Any] = {}
+    
+    def is_item_section(self, name: str) -> bool:
+        return name in SECTION_ITEM_MODELS
+    
+    def start_section(self, name: str) -> None:
+        self.content[name] = []
+    
+    def add_item(self, section: str, index: int, value: Any) -> None:
+        adapter = _ITEM_ADAPTERS[section]
+        try:
+            self.content[section].append(adapter.dump_python(adapter.validate_python(value)))
+        except ValidationError as e:
+            raise ContentValidationError(_located(f"{section}.{index}", e))
+    
+    def set_field(self, name: str, value: Any) -> None:
+        """Validate a top-level field; unknown fields are ignored"""
+        adapter = _FIELD_ADAPTERS.get(name)
+        if adapter is None:
+            return
+        try:
+            self.content[name] = adapter.dump_python(adapter.validate_python(value))
+        except ValidationError as e:
+            raise ContentValidationError(_located(name, e))
+    
+    def finish(self) -> Dict[str, Any]:
+        missing = [
+            f"{name}: Field required"
+            for name, field in ContentData.model_fields.items()
+            if field.is_required() and name not in self.content
+        ]
+        if missing:
+            raise ContentValidationError(missing)
+        content = {}
+        for name, field in ContentData.model_fields.items():
+            if name in self.content:
+                content[name] = self.content[name]
+            elif name != "updated_at":
+                content[name] = field.get_default(call_default_factory=True)
+        return _finish_content(content)
+
+def format_validation_errors(error: Exception) -> List[str]:
+    """Readable "path: message" lines for a pydantic ValidationError"""
+    if isinstance(error, ContentValidationError):
+        return list(error.messages)
+    if not hasattr(error, "errors"):
+        return [str(error)]
+    return [
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    ]
@@ -0,0 +1,72 @@
+"""
+Per-language HTML snapshots of the public CV page: the frontend's
+index.html with the content inlined, so visitors need no API request
+before the page can render
+"""
+
+import html
+import json
+import re
+from typing import Any, Dict
+
+from http_cache import CachedPayload
+
+# Elements of index.html whose text comes straight from the content
+TEXT_FIELDS = {
+    "jobTitle": lambda content, lang: content["personalInfo"]["title"],
+    "email": lambda content, lang: content["personalInfo"]["email"],
+    "phone": lambda content, lang: content["personalInfo"]["phone"],
+    "website": lambda content, lang: content["personalInfo"]["website"],
+    "firstName": lambda content, lang: content["personalInfo"]["name"].split(" ")[0],
+    "lastName": lambda content, lang: " ".join(content["personalInfo"]["name"].split(" ")[1:]),
+    "aboutText": lambda content, lang: (
+        content["aboutDescription"].get(lang) or content["aboutDescription"].get("en") or ""
+    ),
+    "currentLang": lambda content, lang: lang.upper(),
+}
+
+
+def _script_json(data: Any) -> str:
+    """JSON that is safe to place inside a <script> element"""
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return (
+        text.replace("<", "\\u003c")
+        .replace("\u2028", "\\u2028")
+        .replace("\u2029", "\\u2029")
+    )
+
+
+def _replace_text(page: str, element_id: str, text: str) -> str:
+    pattern = re.compile(
+        rf'(<(\w+)\b[^>]*\bid="{re.escape(element_id)}"[^>]*>)(.*?)(</\2>)',
+        re.DOTALL,
+    )
+    return pattern.sub(lambda m: m.group(1) + html.escape(text) + m.group(4), page, count=1)
+
+
+def render_page(template: str, content: Dict[str, Any], lang: str) -> CachedPayload:
+    """Render index.html for one language with the content filled in and inlined.
+
+    The text the page shows first is filled in on the server; the page's
+    script picks up window.__CV_DATA__ instead of fetching /api/content/
+    and renders the lists from it.
+    """
+    page = re.sub(r'<html lang="[^"]*"', f'<html lang="{lang}"', template, count=1)
+
+    for element_id, value in TEXT_FIELDS.items():
+        try:
+            text = value(content, lang)
+        except (KeyError, AttributeError, TypeError):
+            continue
+        page = _replace_text(page, element_id, text)
+
+    inline = (
+        f"<script>window.__CV_DATA__={_script_json(content)};"
+        f"window.__CV_LANG__={_script_json(lang)};</script>\n"
+    )
+    if "</head>" in page:
+        page = page.replace("</head>", inline + "</head>", 1)
+    else:
+        page = inline + page
+
+    return CachedPayload(page.encode("utf-8"), media_type="text/html; charset=utf-8")
@@ -0,0 +1,49 @@
+"""
+In-memory token-bucket rate limiting
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class TokenBucketLimiter:
+    """Independent token bucket per key (e.g. client IP or username).
+
+    Each bucket holds up to `capacity` tokens and refills at
+    `refill_per_second`. Only the `max_keys` most recently seen keys are
+    tracked, so a flood of distinct keys cannot grow memory without bound.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Tuple[bool, float]:
+        """Take one token for key. Returns (allowed, seconds until next token)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed = False
+                retry_after = (1 - tokens) / self.refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return allowed, retry_after
+
+    def reset(self, key: str) -> None:
+        """Forget a key's bucket (e.g. after a successful login)"""
+        with self._lock:
+            self._buckets.pop(key, None)
@@ -1,21 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.auth_debug import AdminCredentials, AuthToken, auth_manager
+from rate_limit import TokenBucketLimiter
 from typing import Optional
+import math
+import os
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 security = HTTPBearer()
 
+# Login attempts are limited per client IP and per username: a burst of
+# LOGIN_RATE_BURST, then LOGIN_RATE_PER_MINUTE. Rejected attempts never
+# reach the (expensive) password check.
+_login_burst = float(os.environ.get("LOGIN_RATE_BURST", "5"))
+_login_per_second = float(os.environ.get("LOGIN_RATE_PER_MINUTE", "10")) / 60
+ip_limiter = TokenBucketLimiter(_login_burst, _login_per_second)
+username_limiter = TokenBucketLimiter(_login_burst, _login_per_second)
+
+def _client_ip(request: Request) -> str:
+    """Client address, honouring X-Forwarded-For only when TRUST_PROXY is set"""
+    if os.environ.get("TRUST_PROXY", "").lower() in ("1", "true", "yes"):
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def _check_login_rate(request: Request, username: str) -> None:
+    for limiter, key in ((ip_limiter, _client_ip(request)), (username_limiter, username)):
+        allowed, retry_after = limiter.acquire(key)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
 @router.post("/login", response_model=AuthToken)
-async def login(credentials: AdminCredentials):
+async def login(credentials: AdminCredentials, request: Request):
     """Authenticate admin user"""
     try:
-        token = auth_manager.authenticate(credentials.username, credentials.password)
+        _check_login_rate(request, credentials.username)
+        token = await auth_manager.authenticate_async(credentials.username, credentials.password)
         if not token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
+        username_limiter.reset(credentials.username)
         return token
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -53,4 +84,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return username
\ No newline at end of file
+    return username
+
+async def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Dependency for admin-only routes; returns the token payload"""
+    payload = auth_manager.decode_token(credentials.credentials)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if payload.get("username") != auth_manager.admin_username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return payload
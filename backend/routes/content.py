@@ -1,23 +1,130 @@
-from fastapi import APIRouter, HTTPException
-from models.content import ContentData, ContentUpdate
-from json_storage import storage
-from typing import Optional
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response, Header
+from pydantic import ValidationError
+from models.content import (
+    BatchOperation, BatchRequest, ContentData, ContentUpdate, SECTION_ITEM_MODELS,
+    format_validation_errors, normalize_item, normalize_section
+)
+from json_storage import async_storage as storage, PreconditionFailed, ConflictError, NotFoundError
+from json_patch import PatchError, PatchTestFailed, apply_patch, merge_patch, split_pointer
+from http_cache import CachedPayload, payload_response
+from content_views import (
+    SECTIONS, SUPPORTED_LANGUAGES, negotiate_language, parse_fields, project_language, select_fields
+)
+from typing import Optional, Tuple
 
 router = APIRouter(prefix="/api/content", tags=["content"])
 
-@router.get("/", response_model=ContentData)
-async def get_content():
-    """Get current content data"""
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+
+def _etag(content: dict) -> str:
+    """ETag of the content a mutation returned.
+    
+    Derived from the returned content rather than re-read from storage,
+    which may already hold a newer version saved by another writer.
+    """
+    return CachedPayload.from_json(content).etag
+
+def _write_error(e: Exception, message: str) -> HTTPException:
+    """Map storage errors raised by a mutation to HTTP errors"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, PreconditionFailed):
+        return HTTPException(status_code=412, detail=str(e))
+    if isinstance(e, (ConflictError, PatchTestFailed)):
+        return HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, NotFoundError):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, ValidationError):
+        return HTTPException(status_code=422, detail=format_validation_errors(e))
+    if isinstance(e, ValueError):
+        # PatchError and the checks in normalize_section()/normalize_item()
+        return HTTPException(status_code=400, detail=str(e))
+    return HTTPException(status_code=500, detail=f"{message}: {str(e)}")
+
+def _resolve_language(request: Request, lang: Optional[str]) -> Tuple[Optional[str], str]:
+    """Validate ?lang= (resolving "auto" from Accept-Language); returns (lang, Vary)"""
+    vary = "Accept-Encoding"
+    if lang == "auto":
+        lang = negotiate_language(request.headers.get("accept-language"))
+        vary = "Accept-Encoding, Accept-Language"
+    if lang is not None and lang not in SUPPORTED_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {lang}")
+    return lang, vary
+
+async def _content_response(
+    request: Request,
+    lang: Optional[str],
+    fields: Optional[str] = None,
+    section: Optional[str] = None
+) -> Response:
+    """Serve the content (or a projection of it) from the per-version view cache"""
+    lang, vary = _resolve_language(request, lang)
+    try:
+        field_names = parse_fields(fields) if fields else ()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def build(content):
+        if lang is not None:
+            content = project_language(content, lang)
+        if section is not None:
+            data = content.get(section, SECTIONS[section])
+        elif field_names:
+            data = select_fields(content, field_names)
+        else:
+            data = content
+        return CachedPayload.from_json(data)
+    
     try:
-        content_data = storage.load_content()
-        return ContentData(**content_data)
+        if lang is None and not field_names and section is None:
+            payload = await storage.get_rendered()
+        else:
+            key = f"content:lang={lang}:fields={','.join(field_names)}:section={section}"
+            payload = await storage.get_view(key, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching content: {str(e)}")
+    
+    headers = {"Content-Language": lang} if lang else {}
+    return payload_response(request, payload, vary=vary, headers=headers)
+
+@router.get("/", response_model=ContentData)
+async def get_content(request: Request, lang: Optional[str] = None, fields: Optional[str] = None):
+    """Get current content data (pre-rendered, supports If-None-Match).
+    
+    With ?lang=en|es|fr only that language's texts are returned;
+    ?lang=auto picks the language from Accept-Language.
+    ?fields=personalInfo,skills returns only the listed top-level fields.
+    """
+    return await _content_response(request, lang, fields=fields)
+
+@router.get("/experiences")
+async def get_experiences(request: Request, lang: Optional[str] = None):
+    """Get the experiences section only"""
+    return await _content_response(request, lang, section="experiences")
+
+@router.get("/education")
+async def get_education(request: Request):
+    """Get the education section only"""
+    return await _content_response(request, None, section="education")
+
+@router.get("/skills")
+async def get_skills(request: Request):
+    """Get the skills section only"""
+    return await _content_response(request, None, section="skills")
+
+@router.get("/languages")
+async def get_languages(request: Request):
+    """Get the languages section only"""
+    return await _content_response(request, None, section="languages")
 
 @router.put("/", response_model=ContentData)
-async def update_content(content_update: ContentUpdate):
-    """Update content data"""
+async def update_content(
+    content_update: ContentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Update content data (send If-Match with the current ETag to avoid lost updates)"""
     try:
         # Prepare updates dict
         updates = {}
@@ -36,74 +143,364 @@ async def update_content(content_update: ContentUpdate):
             updates['aboutDescription'] = content_update.aboutDescription
         
         # Update content
-        updated_content = storage.update_content(updates)
-        
-        return ContentData(**updated_content)
+        updated_content = await storage.update_content(updates, if_match)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating content: {str(e)}")
+        raise _write_error(e, "Error updating content")
+    
+    # Saved by now: a failure building the response is not the client's fault
+    response.headers["ETag"] = _etag(updated_content)
+    return ContentData(**updated_content)
 
-@router.post("/experience", response_model=dict)
-async def add_experience(experience: dict):
-    """Add new experience item"""
+async def _add_item(
+    section: str,
+    label: str,
+    item: dict,
+    response: Response,
+    if_match: Optional[str]
+) -> dict:
     try:
-        # Ensure ID exists
-        if "id" not in experience:
-            experience["id"] = str(uuid.uuid4())
-        
-        current_content = storage.load_content()
-        current_content["experiences"].append(experience)
-        
-        storage.update_content({"experiences": current_content["experiences"]})
-        
-        return {"message": "Experience added successfully", "id": experience["id"]}
+        # Validated like PUT, PATCH and batch adds; a missing id is generated
+        item = normalize_item(section, item)
+        updated_content = await storage.add_item(section, item, if_match)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error adding experience: {str(e)}")
+        raise _write_error(e, f"Error adding {label.lower()}")
+    
+    response.headers["ETag"] = _etag(updated_content)
+    return {"message": f"{label} added successfully", "id": item["id"]}
+
+@router.post("/experience", response_model=dict)
+async def add_experience(
+    experience: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Add new experience item"""
+    return await _add_item("experiences", "Experience", experience, response, if_match)
 
 @router.post("/education", response_model=dict)
-async def add_education(education: dict):
+async def add_education(
+    education: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
     """Add new education item"""
+    return await _add_item("education", "Education", education, response, if_match)
+
+async def _replace_item(
+    section: str,
+    label: str,
+    item_id: str,
+    item: dict,
+    response: Response,
+    if_match: Optional[str]
+) -> dict:
+    if item.setdefault("id", item_id) != item_id:
+        raise HTTPException(status_code=400, detail="The id of an item cannot be changed")
+    
+    try:
+        updated, updated_content = await storage.mutate_item(
+            section, item_id, lambda _: normalize_item(section, item), if_match
+        )
+        response.headers["ETag"] = _etag(updated_content)
+        return updated
+    except Exception as e:
+        raise _write_error(e, f"Error updating {label.lower()}")
+
+async def _delete_item(
+    section: str,
+    label: str,
+    item_id: str,
+    response: Response,
+    if_match: Optional[str]
+) -> dict:
     try:
-        # Ensure ID exists
-        if "id" not in education:
-            education["id"] = str(uuid.uuid4())
+        updated_content = await storage.delete_item(section, item_id, if_match)
+        response.headers["ETag"] = _etag(updated_content)
+        
+        return {"message": f"{label} deleted successfully"}
+    except Exception as e:
+        raise _write_error(e, f"Error deleting {label.lower()}")
+
+class _BatchState:
+    """Content being changed by a batch, with id -> position maps kept per section"""
+    
+    def __init__(self, content: dict):
+        self.content = content
+        self._positions: dict = {}
+    
+    def position(self, section: str, item_id: Optional[str]) -> int:
+        positions = self._positions.get(section)
+        if positions is None:
+            positions = self._positions[section] = {}
+            for index, item in enumerate(self.content[section]):
+                positions.setdefault(item.get("id"), index)
+        if item_id not in positions:
+            raise NotFoundError(f"No item with id {item_id} in {section}")
+        return positions[item_id]
+    
+    def apply(self, operation: BatchOperation) -> dict:
+        section = operation.section
+        items = self.content[section]
         
-        current_content = storage.load_content()
-        current_content["education"].append(education)
+        if operation.op == "add":
+            item = normalize_item(section, operation.item)
+            try:
+                self.position(section, item["id"])
+            except NotFoundError:
+                pass
+            else:
+                raise ConflictError(f"An item with id {item['id']} already exists in {section}")
+            self._positions[section][item["id"]] = len(items)
+            items.append(item)
+            return {"op": "add", "section": section, "id": item["id"]}
         
-        storage.update_content({"education": current_content["education"]})
+        if operation.op == "update":
+            index = self.position(section, operation.id)
+            item = merge_patch(items[index], operation.item)
+            if item.get("id") != operation.id:
+                raise ValueError("The id of an item cannot be changed")
+            items[index] = normalize_item(section, item)
+            return {"op": "update", "section": section, "id": operation.id}
         
-        return {"message": "Education added successfully", "id": education["id"]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error adding education: {str(e)}")
+        if operation.op == "delete":
+            del items[self.position(section, operation.id)]
+            # Later items moved up; rebuild the map on next use
+            self._positions.pop(section, None)
+            return {"op": "delete", "section": section, "id": operation.id}
+        
+        # reorder
+        ids = operation.ids
+        if len(ids) != len(items) or len(set(ids)) != len(ids):
+            raise ValueError(f"'reorder' must list every id of {section} exactly once")
+        self.content[section] = [items[self.position(section, item_id)] for item_id in ids]
+        self._positions.pop(section, None)
+        return {"op": "reorder", "section": section, "ids": ids}
 
-@router.delete("/experience/{experience_id}")
-async def delete_experience(experience_id: str):
-    """Delete experience item"""
+@router.post("/batch", response_model=dict)
+async def batch_update(
+    batch: BatchRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Apply an ordered list of add/update/delete/reorder operations atomically.
+    
+    All operations are applied in a single write (and a single backup);
+    if any of them fails nothing is saved and the error names its index.
+    """
+    results = []
+    failed_at = {}
+    
+    def apply(content):
+        state = _BatchState(content)
+        for index, operation in enumerate(batch.operations):
+            failed_at["index"] = index
+            results.append(state.apply(operation))
+        failed_at.clear()
+    
     try:
-        current_content = storage.load_content()
-        current_content["experiences"] = [
-            exp for exp in current_content["experiences"] 
-            if exp.get("id") != experience_id
-        ]
-        
-        storage.update_content({"experiences": current_content["experiences"]})
+        updated_content = await storage.mutate(apply, if_match)
+        response.headers["ETag"] = _etag(updated_content)
         
-        return {"message": "Experience deleted successfully"}
+        return {"message": f"{len(results)} operations applied", "results": results}
+    except Exception as e:
+        error = _write_error(e, "Error applying batch")
+        if "index" in failed_at:
+            raise HTTPException(
+                status_code=error.status_code,
+                detail={"operation": failed_at["index"], "error": error.detail}
+            )
+        raise error
+
+@router.get("/experience/{experience_id}", response_model=dict)
+async def get_experience(experience_id: str):
+    """Get one experience item by id"""
+    try:
+        return await storage.get_item("experiences", experience_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting experience: {str(e)}")
+        raise _write_error(e, "Error loading experience")
+
+@router.get("/education/{education_id}", response_model=dict)
+async def get_education_item(education_id: str):
+    """Get one education item by id"""
+    try:
+        return await storage.get_item("education", education_id)
+    except Exception as e:
+        raise _write_error(e, "Error loading education")
+
+@router.put("/experience/{experience_id}", response_model=dict)
+async def replace_experience(
+    experience_id: str,
+    experience: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Replace one experience item"""
+    return await _replace_item("experiences", "Experience", experience_id, experience, response, if_match)
+
+@router.put("/education/{education_id}", response_model=dict)
+async def replace_education(
+    education_id: str,
+    education: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Replace one education item"""
+    return await _replace_item("education", "Education", education_id, education, response, if_match)
+
+@router.delete("/experience/{experience_id}")
+async def delete_experience(
+    experience_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Delete experience item"""
+    return await _delete_item("experiences", "Experience", experience_id, response, if_match)
 
 @router.delete("/education/{education_id}")
-async def delete_education(education_id: str):
+async def delete_education(
+    education_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
     """Delete education item"""
+    return await _delete_item("education", "Education", education_id, response, if_match)
+
+async def _read_patch(request: Request) -> Tuple[str, object]:
+    """Return the patch media type and parsed body of a PATCH request"""
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type not in (JSON_PATCH, MERGE_PATCH, "application/json"):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Use {JSON_PATCH} or {MERGE_PATCH}",
+            headers={"Accept-Patch": f"{JSON_PATCH}, {MERGE_PATCH}"}
+        )
     try:
-        current_content = storage.load_content()
-        current_content["education"] = [
-            edu for edu in current_content["education"] 
-            if edu.get("id") != education_id
-        ]
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if media_type != JSON_PATCH and not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="A merge patch must be a JSON object")
+    return media_type, body
+
+def _touched_by_json_patch(ops: object) -> Tuple[set, set]:
+    """Top-level fields and (section, index) items a JSON patch changes.
+    
+    An item is only tracked on its own when the operation edits it in
+    place; anything that inserts, removes or moves list entries marks the
+    whole section, since indexes shift.
+    """
+    if not isinstance(ops, list):
+        raise PatchError("A JSON patch must be a list of operations")
+    
+    sections, items = set(), set()
+    for op in ops:
+        if not isinstance(op, dict) or "path" not in op:
+            raise PatchError(f"Invalid patch operation: {op!r}")
+        if op.get("op") == "test":
+            continue
         
-        storage.update_content({"education": current_content["education"]})
+        # "move" also removes the value at "from"; "copy" only reads it
+        pointers = [(op["path"], op.get("op"))]
+        if op.get("op") == "move" and "from" in op:
+            pointers.append((op["from"], "remove"))
         
-        return {"message": "Education deleted successfully"}
+        for pointer, name in pointers:
+            tokens = split_pointer(pointer)
+            if not tokens:
+                raise PatchError("Patching the whole document is not allowed, use PUT")
+            section = tokens[0]
+            in_place = len(tokens) >= 3 or (len(tokens) == 2 and name == "replace")
+            if section in SECTION_ITEM_MODELS and in_place and tokens[1].isdigit():
+                items.add((section, int(tokens[1])))
+            else:
+                sections.add(section)
+    return sections, items
+
+def _normalize_touched(content: dict, sections: set, items: set) -> None:
+    """Validate only what a patch changed, storing the normalized values"""
+    for section in sections:
+        if section not in content:
+            raise ValueError(f"Field cannot be removed: {section}")
+        content[section] = normalize_section(section, content[section])
+    
+    for section, index in items:
+        if section in sections:
+            continue
+        items_list = content.get(section)
+        if isinstance(items_list, list) and index < len(items_list):
+            items_list[index] = normalize_item(section, items_list[index])
+
+@router.patch("/", response_model=ContentData)
+async def patch_content(
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Partially update content with a JSON Patch (RFC 6902) or JSON Merge Patch (RFC 7396).
+    
+    Only the fields and list items the patch touches are re-validated.
+    """
+    media_type, body = await _read_patch(request)
+    
+    def apply(content):
+        if media_type == JSON_PATCH:
+            sections, items = _touched_by_json_patch(body)
+            apply_patch(content, body)
+        else:
+            sections, items = set(body), set()
+            merge_patch(content, body)
+        _normalize_touched(content, sections, items)
+    
+    try:
+        updated_content = await storage.mutate(apply, if_match)
+    except Exception as e:
+        raise _write_error(e, "Error patching content")
+    
+    response.headers["ETag"] = _etag(updated_content)
+    return ContentData(**updated_content)
+
+async def _patch_item(
+    section: str,
+    label: str,
+    item_id: str,
+    request: Request,
+    response: Response,
+    if_match: Optional[str]
+) -> dict:
+    media_type, body = await _read_patch(request)
+    
+    def apply(item):
+        if media_type == JSON_PATCH:
+            item = apply_patch(item, body)
+        else:
+            item = merge_patch(item, body)
+        if not isinstance(item, dict) or item.get("id") != item_id:
+            raise ValueError("The id of an item cannot be changed")
+        return normalize_item(section, item)
+    
+    try:
+        updated, updated_content = await storage.mutate_item(section, item_id, apply, if_match)
+        response.headers["ETag"] = _etag(updated_content)
+        return updated
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting education: {str(e)}")
\ No newline at end of file
+        raise _write_error(e, f"Error patching {label.lower()}")
+
+@router.patch("/experience/{experience_id}", response_model=dict)
+async def patch_experience(
+    experience_id: str,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Partially update one experience item (JSON Patch or merge patch)"""
+    return await _patch_item("experiences", "Experience", experience_id, request, response, if_match)
+
+@router.patch("/education/{education_id}", response_model=dict)
+async def patch_education(
+    education_id: str,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """Partially update one education item (JSON Patch or merge patch)"""
+    return await _patch_item("education", "Education", education_id, request, response, if_match)
\ No newline at end of file
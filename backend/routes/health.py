@@ -0,0 +1,97 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from json_storage import storage
+from datetime import datetime
+from typing import Any, Dict, Optional
+import os
+import shutil
+import time
+
+router = APIRouter(tags=["Health"])
+
+# Readiness is re-checked at most once per HEALTH_CACHE_TTL seconds, so
+# frequent probes (Docker, load balancers) cost a dictionary lookup
+HEALTH_CACHE_TTL = float(os.environ.get("HEALTH_CACHE_TTL", "5"))
+# Below this much free space on the data volume saves may start failing
+HEALTH_MIN_FREE_BYTES = int(os.environ.get("HEALTH_MIN_FREE_BYTES", str(50 * 1024 * 1024)))
+
+_readiness: Optional[Dict[str, Any]] = None
+_readiness_expires = 0.0
+
+def _check(fn) -> Dict[str, Any]:
+    try:
+        result = fn() or {}
+        return {"status": "ok", **result}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _check_storage_writable() -> Dict[str, Any]:
+    if not os.access(storage.data_dir, os.W_OK):
+        raise RuntimeError(f"{storage.data_dir} is not writable")
+    if storage.content_file.exists() and not os.access(storage.content_file, os.W_OK):
+        raise RuntimeError(f"{storage.content_file} is not writable")
+
+def _check_snapshot() -> Dict[str, Any]:
+    # Re-validates the cached snapshot against the file (a stat when unchanged)
+    content = storage.get_snapshot()
+    return {"version": content.get("version"), "updated_at": content.get("updated_at")}
+
+def _check_disk_space() -> Dict[str, Any]:
+    free = shutil.disk_usage(storage.data_dir).free
+    if free < HEALTH_MIN_FREE_BYTES:
+        raise RuntimeError(f"Only {free} bytes free on the data volume")
+    return {"free_bytes": free}
+
+def _check_backups() -> Dict[str, Any]:
+    backups = storage.backups
+    for directory in (backups.backup_dir, backups.blob_dir):
+        if not directory.is_dir() or not os.access(directory, os.W_OK):
+            raise RuntimeError(f"{directory} is missing or not writable")
+    return {"revisions": len(backups.names())}
+
+def _run_readiness_checks() -> Dict[str, Any]:
+    checks = {
+        "storage_writable": _check(_check_storage_writable),
+        "snapshot": _check(_check_snapshot),
+        "disk_space": _check(_check_disk_space),
+        "backups": _check(_check_backups),
+    }
+    ready = all(check["status"] == "ok" for check in checks.values())
+    return {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "checked_at": datetime.utcnow().isoformat()
+    }
+
+async def get_readiness() -> Dict[str, Any]:
+    """Latest readiness result, re-checked once it is older than HEALTH_CACHE_TTL"""
+    global _readiness, _readiness_expires
+    if _readiness is None or time.monotonic() >= _readiness_expires:
+        _readiness = await run_in_threadpool(_run_readiness_checks)
+        _readiness_expires = time.monotonic() + HEALTH_CACHE_TTL
+    return _readiness
+
+# Health check endpoint (sin prefijo para Docker health check)
+@router.get("/health")
+async def health_check():
+    """Backend status; storage state comes from the cached readiness checks"""
+    readiness = await get_readiness()
+
+    return {
+        "status": "healthy",
+        "message": "Backend is running",
+        "storage": "connected" if readiness["status"] == "ready" else "error",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/health/live")
+async def liveness():
+    """The process is up and serving requests (no I/O)"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness():
+    """Whether the backend can serve and save content; 503 if any check fails"""
+    result = await get_readiness()
+    return JSONResponse(status_code=200 if result["status"] == "ready" else 503, content=result)
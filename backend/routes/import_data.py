@@ -1,32 +1,54 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, HTTPException, File, UploadFile, Depends, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
 import json
 import os
-from typing import Dict, Any
-import jwt
+import zlib
+from typing import BinaryIO, Dict, Any, Iterable, Iterator
 from datetime import datetime
-from json_storage import storage
+from json_storage import async_storage as storage
+from content_diff import diff_content
+from http_cache import CachedPayload, accepted_encodings, payload_response
+from json_stream import JSONStreamError, JSONStreamReader, StreamTooLarge
+from models.content import ContentData, ContentValidationError, ContentValidator, format_validation_errors
+from routes.auth import require_admin
 
 router = APIRouter(prefix="/api/import", tags=["Data Import"])
 
-# JWT verification
-security = HTTPBearer()
+# Largest accepted import file (a full CV is a few tens of KB)
+MAX_IMPORT_BYTES = int(os.environ.get("MAX_IMPORT_BYTES", str(5 * 1024 * 1024)))
+IMPORT_CHUNK_SIZE = 64 * 1024
+# Top-level fields an import may set; anything else is skipped unread
+CONTENT_FIELDS = frozenset(ContentData.model_fields) - {"updated_at"}
+# Validation errors listed in a rejected import's report
+MAX_REPORTED_ERRORS = 50
 
-def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token for admin access"""
-    try:
-        payload = jwt.decode(
-            credentials.credentials, 
-            os.environ.get("JWT_SECRET", "fallback_secret"), 
-            algorithms=["HS256"]
-        )
-        if payload.get("username") != os.environ.get("ADMIN_USERNAME", "admin"):
-            raise HTTPException(status_code=403, detail="Access denied")
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+def _parse_upload(file: BinaryIO, limit: int) -> Dict[str, Any]:
+    """Parse and validate an import straight from the spooled upload.
+    
+    The file is read in chunks and each list item and field is validated
+    as soon as it has been parsed, so neither the whole file nor its
+    decoded text is ever held in memory, and the first schema violation
+    (ContentValidationError) or the limit being crossed (StreamTooLarge)
+    stops the import without reading any further.
+    """
+    reader = JSONStreamReader(file, limit=limit, chunk_size=IMPORT_CHUNK_SIZE)
+    if reader.peek() != "{":
+        raise ValueError("Import file must contain a JSON object")
+    
+    validator = ContentValidator()
+    for key in reader.iter_object():
+        if validator.is_item_section(key) and reader.peek() == "[":
+            validator.start_section(key)
+            for index in reader.iter_array():
+                validator.add_item(key, index, reader.read_value())
+        elif key in CONTENT_FIELDS:
+            validator.set_field(key, reader.read_value())
+        else:
+            reader.skip_value()
+    reader.end()
+    return validator.finish()
 
 @router.get("/debug")
 async def debug_import_system():
@@ -64,7 +86,7 @@ async def debug_import_system():
     
     # Test 3: JSON Storage access
     try:
-        content = storage.load_content()
+        content = await storage.get_snapshot()
         debug_info["checks"]["storage"] = {
             "status": "ok", 
             "content_loaded": bool(content),
@@ -75,7 +97,7 @@ async def debug_import_system():
     
     # Test 4: Data structure validation
     try:
-        content = storage.load_content()
+        content = await storage.get_snapshot()
         required_fields = ["personalInfo", "experiences", "education", "skills", "languages", "aboutDescription"]
         missing_fields = [field for field in required_fields if field not in content]
         
@@ -95,7 +117,7 @@ async def debug_import_system():
     return debug_info
 
 @router.post("/test-auth")
-async def test_auth_system(current_user: dict = Depends(verify_jwt_token)):
+async def test_auth_system(current_user: dict = Depends(require_admin)):
     """Test JWT authentication system"""
     return {
         "status": "ok",
@@ -107,9 +129,14 @@ async def test_auth_system(current_user: dict = Depends(verify_jwt_token)):
 @router.post("/cv-data")
 async def import_cv_data(
     file: UploadFile = File(...),
-    current_user: dict = Depends(verify_jwt_token)
+    dry_run: bool = False,
+    current_user: dict = Depends(require_admin)
 ):
-    """Import CV data from JSON file"""
+    """Import CV data from JSON file.
+    
+    With ?dry_run=true the file is validated and compared with the current
+    content, and the differences are returned without saving anything.
+    """
     
     import logging
     logger = logging.getLogger(__name__)
@@ -123,19 +150,43 @@ async def import_cv_data(
         logger.error(f"Invalid file type: {file.filename}")
         raise HTTPException(status_code=400, detail="Only JSON files are allowed")
     
+    # Starlette knows the size of the spooled upload, so most oversized
+    # files are rejected without reading them at all
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Import file is larger than the {MAX_IMPORT_BYTES} byte limit"
+    )
+    if file.size is not None and file.size > MAX_IMPORT_BYTES:
+        raise too_large
+    
     try:
-        # Read and parse JSON file
-        logger.info("Reading file contents...")
-        contents = await file.read()
-        logger.info(f"File size: {len(contents)} bytes")
-        
-        logger.info("Parsing JSON...")
-        cv_data = json.loads(contents.decode('utf-8'))
+        # Parsed and validated piece by piece, off the event loop
+        logger.info("Parsing and validating against the CV schema...")
+        cv_data = await run_in_threadpool(_parse_upload, file.file, MAX_IMPORT_BYTES)
         logger.info(f"JSON parsed successfully. Keys: {list(cv_data.keys())}")
         
+        if dry_run:
+            current_content = await storage.get_snapshot()
+            diff = await run_in_threadpool(diff_content, current_content, cv_data)
+            logger.info(f"Dry run finished, changed sections: {list(diff['sections'])}")
+            return {
+                "success": True,
+                "dry_run": True,
+                "message": "CV data is valid, nothing was imported",
+                "filename": file.filename,
+                "timestamp": datetime.utcnow().isoformat(),
+                "diff": diff,
+                "records_count": {
+                    "experiences": len(cv_data.get("experiences", [])),
+                    "education": len(cv_data.get("education", [])),
+                    "skills_categories": len(cv_data.get("skills", {})),
+                    "languages": len(cv_data.get("languages", []))
+                }
+            }
+        
         # Import using JSON storage
         logger.info("Importing data to JSON storage...")
-        storage.import_content(cv_data)
+        await storage.import_content(cv_data)
         logger.info("Import successful!")
         
         response_data = {
@@ -154,7 +205,19 @@ async def import_cv_data(
         logger.info(f"Import successful: {response_data}")
         return response_data
         
-    except json.JSONDecodeError as e:
+    except HTTPException:
+        raise
+    except StreamTooLarge:
+        raise too_large
+    except (ValidationError, ContentValidationError) as e:
+        errors = format_validation_errors(e)
+        logger.error(f"Import does not match the CV schema: {len(errors)} errors")
+        raise HTTPException(status_code=422, detail={
+            "message": "Import does not match the CV schema",
+            "error_count": len(errors),
+            "errors": errors[:MAX_REPORTED_ERRORS]
+        })
+    except (JSONStreamError, UnicodeDecodeError) as e:
         logger.error(f"JSON decode error: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
     except ValueError as e:
@@ -167,19 +230,18 @@ async def import_cv_data(
 
 @router.post("/quick-init")
 async def quick_initialize_default_data(
-    current_user: dict = Depends(verify_jwt_token)
+    current_user: dict = Depends(require_admin)
 ):
     """Quick initialize with default CV data (no file upload needed)"""
     
     try:
         # Check if data already exists
-        current_content = storage.load_content()
+        current_content = await storage.get_snapshot()
         if current_content.get("experiences") or current_content.get("education"):
             raise HTTPException(status_code=400, detail="CV data already exists. Use import to replace.")
         
         # Force creation of default content
-        storage._create_default_content()
-        content = storage.load_content()
+        content = await storage.reset_to_default()
         
         return {
             "success": True,
@@ -197,43 +259,99 @@ async def quick_initialize_default_data(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Initialization failed: {str(e)}")
 
+class _ExportPayload(CachedPayload):
+    """A rendered export, with the version of the snapshot it was built from"""
+    
+    def __init__(self, body: bytes, version: int, media_type: str = "application/json"):
+        super().__init__(body, media_type=media_type)
+        self.version = version
+
+def _records_count(content: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "experiences": len(content.get("experiences", [])),
+        "education": len(content.get("education", [])),
+        "skills_categories": len(content.get("skills", {})),
+        "languages": len(content.get("languages", []))
+    }
+
+def _export_json(content: Dict[str, Any]) -> _ExportPayload:
+    """{"success": true, "data": ..., "records_count": ... up to the per-request fields.
+    
+    Body and counts come from the same snapshot, whatever is saved while
+    the export is being sent.
+    """
+    data = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    records = json.dumps(_records_count(content))
+    body = f'{{"success":true,"data":{data},"records_count":{records}'.encode("utf-8")
+    return _ExportPayload(body, content.get("version", 0))
+
+def _export_ndjson(content: Dict[str, Any]) -> _ExportPayload:
+    """One JSON line per experience and education item"""
+    lines = [
+        json.dumps({"section": section, **item}, ensure_ascii=False, separators=(",", ":"))
+        for section in ("experiences", "education")
+        for item in content.get(section, [])
+    ]
+    body = "".join(line + "\n" for line in lines).encode("utf-8")
+    return _ExportPayload(body, content.get("version", 0), media_type="application/x-ndjson")
+
+def _gzip_stream(parts: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for part in parts:
+        chunk = compressor.compress(part)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
 @router.get("/export")
 async def export_cv_data(
-    current_user: dict = Depends(verify_jwt_token)
+    request: Request,
+    format: str = "json",
+    download: bool = False,
+    current_user: dict = Depends(require_admin)
 ):
-    """Export current CV data as JSON"""
+    """Export current CV data as JSON (or ?format=ndjson, one line per item).
+    
+    The export is rendered once per content version and only the
+    timestamp is added per request; ?download=true adds a
+    Content-Disposition header so browsers save it as a file.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
     
     try:
-        content = storage.export_content()
+        builder = _export_ndjson if format == "ndjson" else _export_json
+        payload = await storage.get_view(f"export.{format}", builder)
+        headers = {}
+        if download:
+            filename = f"cv_content_v{payload.version}.{format}"
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
         
-        return {
-            "success": True,
-            "data": content,
-            "exported_at": datetime.utcnow().isoformat(),
-            "records_count": {
-                "experiences": len(content.get("experiences", [])),
-                "education": len(content.get("education", [])),
-                "skills_categories": len(content.get("skills", {})),
-                "languages": len(content.get("languages", []))
-            }
-        }
+        if format == "ndjson":
+            return payload_response(request, payload, cache_control="private, no-cache", headers=headers)
+        
+        exported_at = json.dumps(datetime.utcnow().isoformat())
+        parts = [payload.body, f',"exported_at":{exported_at}}}'.encode("utf-8")]
+        
+        headers["Cache-Control"] = "private, no-store"
+        headers["Vary"] = "Accept-Encoding"
+        if "gzip" in accepted_encodings(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(_gzip_stream(parts), media_type="application/json", headers=headers)
+        return StreamingResponse(iter(parts), media_type="application/json", headers=headers)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 @router.delete("/cv-data")
 async def clear_cv_data(
-    current_user: dict = Depends(verify_jwt_token)
+    current_user: dict = Depends(require_admin)
 ):
     """Clear all CV data and reset to default"""
     
     try:
-        # Delete current data file
-        if storage.content_file.exists():
-            storage.content_file.unlink()
-        
-        # Create fresh default content
-        storage._create_default_content()
+        # Replace current data with fresh default content
+        await storage.reset_to_default()
         
         return {
             "success": True,
@@ -248,7 +366,7 @@ async def get_import_status():
     """Get the current status of CV data"""
     
     try:
-        content = storage.load_content()
+        content = await storage.get_snapshot()
         
         return {
             "initialized": True,
@@ -256,7 +374,7 @@ async def get_import_status():
             "storage_type": "JSON file system",
             "last_updated": content.get("updated_at", "Unknown"),
             "data_file": str(storage.content_file),
-            "backups_available": len(storage.get_backups()),
+            "backups_available": len(await storage.get_backups()),
             "records_count": {
                 "experiences": len(content.get("experiences", [])),
                 "education": len(content.get("education", [])),
@@ -273,15 +391,16 @@ async def get_import_status():
 
 @router.get("/backups")
 async def list_backups(
-    current_user: dict = Depends(verify_jwt_token)
+    current_user: dict = Depends(require_admin)
 ):
     """List available backups"""
     
     try:
-        backups = storage.get_backups()
+        backups = await storage.get_backups()
         return {
             "success": True,
             "backups": backups,
+            "revisions": await storage.get_backup_history(),
             "backup_dir": str(storage.backup_dir)
         }
     except Exception as e:
@@ -290,12 +409,12 @@ async def list_backups(
 @router.post("/restore/{backup_name}")
 async def restore_backup(
     backup_name: str,
-    current_user: dict = Depends(verify_jwt_token)
+    current_user: dict = Depends(require_admin)
 ):
     """Restore from backup"""
     
     try:
-        content = storage.restore_backup(backup_name)
+        content = await storage.restore_backup(backup_name)
         return {
             "success": True,
             "message": f"Successfully restored from backup: {backup_name}",
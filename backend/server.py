@@ -1,8 +1,9 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import os
 import logging
 from pathlib import Path
@@ -10,7 +11,12 @@ from pydantic import BaseModel, Field
 from typing import List
 import uuid
 from datetime import datetime
-from json_storage import storage
+from json_storage import async_storage
+from static_assets import StaticAssets
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from http_cache import payload_response
+from content_views import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
+from prerender import render_page
 
 
 ROOT_DIR = Path(__file__).parent
@@ -19,23 +25,6 @@ load_dotenv(ROOT_DIR / '.env')
 # Create the main app without a prefix
 app = FastAPI(title="CV Backend API", description="Simple CV management system with JSON storage")
 
-# Health check endpoint (sin prefijo para Docker health check)
-@app.get("/health")
-async def health_check():
-    try:
-        # Test JSON storage access
-        content = storage.load_content()
-        storage_status = "connected"
-    except:
-        storage_status = "error"
-    
-    return {
-        "status": "healthy", 
-        "message": "Backend is running",
-        "storage": storage_status,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-
 # Test route
 @app.get("/test")
 async def test_route():
@@ -58,6 +47,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latencies per route, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics")
+async def metrics():
+    """Metrics in the Prometheus text format"""
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -69,7 +66,9 @@ logger = logging.getLogger(__name__)
 from routes.content import router as content_router
 from routes.auth import router as auth_router
 from routes.import_data import router as import_data_router
+from routes.health import router as health_router
 
+app.include_router(health_router)
 app.include_router(content_router)
 app.include_router(auth_router)
 app.include_router(import_data_router)
@@ -78,17 +77,21 @@ app.include_router(import_data_router)
 app.include_router(api_router)
 
 # Mount static files and frontend routes LAST
-static_dir = Path("/app/frontend_build")
+static_dir = Path(os.environ.get("FRONTEND_BUILD_DIR", "/app/frontend_build"))
 if static_dir.exists():
     logger.info(f"Frontend build directory found at {static_dir}")
     
+    # The build is read into memory once (and re-read when a file changes)
+    # and served with gzip/brotli variants, ETag and Last-Modified
+    frontend_assets = StaticAssets(static_dir)
+    
     # Add special route for admin page
     @app.get("/admin")
-    async def serve_admin():
+    async def serve_admin(request: Request):
         """Serve admin.html for admin routes"""
-        admin_file = static_dir / "admin.html"
-        if admin_file.exists():
-            return FileResponse(str(admin_file))
+        response = frontend_assets.response(request, "admin.html")
+        if response is not None:
+            return response
         else:
             return {"detail": "Admin page not found"}
     
@@ -102,35 +105,76 @@ if static_dir.exists():
         else:
             return {"detail": "Debug admin page not found"}
     
+    async def serve_page(request: Request, lang: str):
+        """index.html with the current content inlined, rendered once per content version"""
+        template = frontend_assets.get("index.html")
+        if template is None:
+            return {"detail": "Frontend not built"}
+        
+        # The key also names the template, so a new frontend build is picked up
+        payload = await async_storage.get_view(
+            f"page.{lang}.{template.payload.etag}",
+            lambda content: render_page(template.payload.body.decode("utf-8"), content, lang)
+        )
+        return payload_response(request, payload)
+    
     # Add root route
     @app.get("/")
-    async def serve_index():
-        """Serve index.html for root route"""
-        index_file = static_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(str(index_file))
-        else:
-            return {"detail": "Frontend not built"}
+    async def serve_index(request: Request):
+        """Serve the prerendered page for root route"""
+        return await serve_page(request, DEFAULT_LANGUAGE)
     
-    # Serve frontend for all other non-API routes
-    @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
-        """Serve frontend for all routes that don't start with /api or /health"""
-        if full_path.startswith("api/") or full_path == "health":
-            # Let API routes handle themselves
-            return {"detail": "API endpoint"}
-        
-        # For admin routes, serve admin.html
-        if full_path == "admin" or full_path.startswith("admin/"):
-            admin_file = static_dir / "admin.html"
-            if admin_file.exists():
-                return FileResponse(str(admin_file))
-        
-        # For all other routes, serve index.html (SPA behavior)
-        index_file = static_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(str(index_file))
-        else:
-            return {"detail": "Frontend not built"}
+    async def serve_localized_index(request: Request):
+        """Serve the prerendered page in the language named by the path (/es, /fr)"""
+        return await serve_page(request, request.url.path.strip("/"))
+    
+    for lang in SUPPORTED_LANGUAGES:
+        if lang != DEFAULT_LANGUAGE:
+            app.add_api_route(f"/{lang}", serve_localized_index, methods=["GET"])
+    
+    # Hashed build files (static/js/main.<hash>.js...)
+    @app.get("/static/{asset_path:path}")
+    async def serve_static(request: Request, asset_path: str):
+        """Serve a file of the frontend build's static/ directory"""
+        response = frontend_assets.response(request, f"static/{asset_path}")
+        if response is not None:
+            return response
+        raise StarletteHTTPException(status_code=404)
 else:
-    logger.warning("Frontend build directory not found at /app/frontend_build")
+    logger.warning(f"Frontend build directory not found at {static_dir}")
+    frontend_assets = None
+
+# Instead of a catch-all route (which would answer unknown API paths too),
+# URLs no route matched end up here
+@app.exception_handler(404)
+async def not_found_handler(request: Request, exc: StarletteHTTPException):
+    """Serve the frontend for unknown page URLs; everything else is a plain 404"""
+    path = request.url.path
+    is_page_request = (
+        frontend_assets is not None
+        # A route matched and raised the 404 itself (e.g. unknown item id)
+        and "endpoint" not in request.scope
+        and request.method in ("GET", "HEAD")
+        and not path.startswith(("/api/", "/health"))
+        and path != "/api"
+    )
+    
+    if is_page_request:
+        # Build files outside static/ (favicon.ico, asset-manifest.json...)
+        response = frontend_assets.response(request, path)
+        if response is not None:
+            return response
+        
+        # SPA fallback, only for browsers navigating to a page
+        if "text/html" in request.headers.get("accept", ""):
+            if path.startswith("/admin/"):
+                response = frontend_assets.response(request, "admin.html")
+                if response is not None:
+                    return response
+            return await serve_page(request, DEFAULT_LANGUAGE)
+    
+    return JSONResponse(
+        status_code=404,
+        content={"detail": getattr(exc, "detail", "Not Found")},
+        headers=getattr(exc, "headers", None)
+    )
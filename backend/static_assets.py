@@ -0,0 +1,130 @@
+"""
+In-memory cache of the frontend build, served with precompressed
+variants, validators and long-lived caching for hashed assets
+"""
+
+import mimetypes
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from http_cache import CachedPayload, payload_response
+
+# Files under static/ carry a content hash in their name (main.b3224de5.js),
+# so a given URL never changes and browsers may keep it for a year
+IMMUTABLE_PREFIX = "static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Pages (index.html, admin.html) must be revalidated to pick up new builds
+PAGE_CACHE_CONTROL = "no-cache"
+
+# Larger files are streamed from disk as they are, not kept in memory
+MAX_CACHED_SIZE = 8 * 1024 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "image/svg+xml",
+    "application/xml", "application/manifest+json",
+)
+
+
+class StaticAsset:
+    def __init__(self, payload: CachedPayload, mtime: float):
+        self.payload = payload
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.mtime = int(mtime)
+
+
+class StaticAssets:
+    """Files of a frontend build directory, loaded once and reloaded when they change.
+
+    Each cached file is keyed by its (inode, size, mtime), so serving it
+    costs one stat; a rebuilt frontend is picked up on the next request.
+    """
+
+    def __init__(self, root: Path, preload: bool = True):
+        self.root = Path(root).resolve()
+        self._assets: Dict[str, Tuple[Tuple[int, int, int], StaticAsset]] = {}
+        self._lock = threading.Lock()
+
+        if preload and self.root.is_dir():
+            for path in self.root.rglob("*"):
+                if path.is_file():
+                    self.get(path.relative_to(self.root).as_posix())
+
+    def _resolve(self, rel_path: str) -> Optional[Path]:
+        path = (self.root / rel_path.lstrip("/")).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        return path
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        """Return the cached asset for a path relative to the build root, if it exists"""
+        path = self._resolve(rel_path)
+        if path is None:
+            return None
+        try:
+            st = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not path.is_file() or st.st_size > MAX_CACHED_SIZE:
+            return None
+
+        # Keyed by the file, not the URL spelling (static/js//main.js)
+        name = path.relative_to(self.root).as_posix()
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self._assets.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        payload = CachedPayload(
+            path.read_bytes(),
+            media_type=media_type,
+            compress=media_type.startswith(COMPRESSIBLE_TYPES),
+        )
+        asset = StaticAsset(payload, st.st_mtime)
+        with self._lock:
+            self._assets[name] = (key, asset)
+        return asset
+
+    def response(self, request: Request, rel_path: str) -> Optional[Response]:
+        """Serve an asset (or 304), or return None if there is no such file"""
+        path = self._resolve(rel_path)
+        if path is None:
+            return None
+        name = path.relative_to(self.root).as_posix()
+        cache_control = PAGE_CACHE_CONTROL
+        if name.startswith(IMMUTABLE_PREFIX):
+            cache_control = IMMUTABLE_CACHE_CONTROL
+
+        asset = self.get(name)
+        if asset is None:
+            if path.is_file():
+                # Too large to keep in memory
+                return FileResponse(str(path), headers={"Cache-Control": cache_control})
+            return None
+
+        headers = {"Last-Modified": asset.last_modified}
+
+        # If-None-Match wins when both validators are sent (RFC 7232 §6)
+        if "if-none-match" not in request.headers and _not_modified_since(
+            request.headers.get("if-modified-since"), asset.mtime
+        ):
+            headers.update({"ETag": asset.payload.etag, "Cache-Control": cache_control})
+            return Response(status_code=304, headers=headers)
+
+        return payload_response(request, asset.payload, cache_control=cache_control, headers=headers)
+
+
+def _not_modified_since(header: Optional[str], mtime: int) -> bool:
+    if not header:
+        return False
+    try:
+        return mtime <= int(parsedate_to_datetime(header).timestamp())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return False
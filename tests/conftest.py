@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_DIR / "backend"
+
+# The backend is a flat set of modules run from its own directory
+sys.path.insert(0, str(BACKEND_DIR))
+
+# The global storage instance is created on import: keep it away from /app
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="cv-test-data-"))
+os.environ.setdefault("FRONTEND_BUILD_DIR", str(REPO_DIR / "frontend_build"))
+
+
+@pytest.fixture
+def make_storage(tmp_path):
+    """Build JSONStorage instances over one data directory (a new instance is a restart)"""
+    from json_storage import JSONStorage
+
+    def make(**kwargs):
+        return JSONStorage(str(tmp_path), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def client():
+    """TestClient for the app, over the DATA_DIR storage (shared by the tests using it)"""
+    from fastapi.testclient import TestClient
+    import server
+
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from backup_store import BackupStore
+
+
+def _revision(index):
+    return json.dumps({"version": index, "text": "x" * 100}).encode("utf-8")
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = BackupStore(tmp_path, max_revisions=10)
+
+    first = store.record(_revision(1))
+    assert store.record(_revision(1)) is None  # same as the latest revision
+    store.record(_revision(2))
+    again = store.record(_revision(1))
+
+    assert again != first
+    assert store.read(again) == store.read(first)
+    assert len(list(store.blob_dir.glob("*.json"))) == 2
+
+
+def test_pruning_drops_old_revisions_and_their_blobs(tmp_path):
+    store = BackupStore(tmp_path, max_revisions=5)
+    names = [store.record(_revision(index), version=index) for index in range(20)]
+
+    kept = store.names()
+    assert len(kept) == 5
+    assert kept == names[:-6:-1]
+    # The index keeps at most max_revisions plus 10% (at least one) slack
+    # between prunes; blobs of pruned revisions are deleted
+    assert len(list(store.blob_dir.glob("*.json"))) <= 5 + 1
+    assert all(store.read(name) for name in kept)
+    assert [entry["version"] for entry in store.entries()] == list(range(19, 19 - len(kept), -1))
+
+
+def test_restart_reloads_index_and_continues_sequence(tmp_path):
+    store = BackupStore(tmp_path, max_revisions=50)
+    for index in range(5):
+        store.record(_revision(index))
+    names = store.names()
+
+    restarted = BackupStore(tmp_path, max_revisions=50)
+    assert restarted.names() == names
+    assert restarted.read(names[0]) == _revision(4)
+
+    new_name = restarted.record(_revision(5))
+    assert new_name not in names
+    assert BackupStore(tmp_path, max_revisions=50).names() == [new_name] + names
+
+
+def test_restart_with_lower_limit_prunes(tmp_path):
+    store = BackupStore(tmp_path, max_revisions=50)
+    for index in range(10):
+        store.record(_revision(index))
+
+    restarted = BackupStore(tmp_path, max_revisions=3)
+    assert len(restarted.names()) == 3
+    assert len(list(restarted.blob_dir.glob("*.json"))) == 3
+    assert len(restarted.index_file.read_text().splitlines()) == 3
+
+
+def test_torn_index_line_is_ignored(tmp_path):
+    store = BackupStore(tmp_path, max_revisions=10)
+    names = [store.record(_revision(index)) for index in range(3)]
+    with open(store.index_file, "a") as f:
+        f.write('{"name": "r0000')
+
+    restarted = BackupStore(tmp_path, max_revisions=10)
+    assert restarted.names() == names[::-1]
+
+    # A revision recorded after the torn line survives the next restart
+    names.append(restarted.record(_revision(3)))
+    reloaded = BackupStore(tmp_path, max_revisions=10)
+    assert reloaded.names() == names[::-1]
+    assert reloaded.read(names[-1]) == _revision(3)
+
+
+def test_failed_index_append_does_not_swallow_the_next_one(tmp_path, monkeypatch):
+    import backup_store
+
+    store = BackupStore(tmp_path, max_revisions=10)
+    names = [store.record(_revision(0))]
+
+    def torn_append(path, data):
+        with open(path, "ab") as f:
+            f.write(data[:10])
+        raise OSError("No space left on device")
+
+    real_append = backup_store.append_durable
+    monkeypatch.setattr(backup_store, "append_durable", torn_append)
+    with pytest.raises(OSError):
+        store.record(_revision(1))
+    monkeypatch.setattr(backup_store, "append_durable", real_append)
+
+    names.append(store.record(_revision(2)))
+    assert set(names) <= set(BackupStore(tmp_path, max_revisions=10).names())
+
+
+def test_legacy_backups_are_migrated(tmp_path):
+    (tmp_path / "cv_content_backup_20240101_000000.json").write_bytes(_revision(1))
+
+    store = BackupStore(tmp_path, max_revisions=10)
+
+    assert store.names() == ["cv_content_backup_20240101_000000.json"]
+    assert store.read("cv_content_backup_20240101_000000.json") == _revision(1)
+    assert not list(tmp_path.glob("cv_content_backup_*.json"))
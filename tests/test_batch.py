@@ -0,0 +1,46 @@
+import pytest
+
+
+def _education(title):
+    return {"title": title, "institution": "Test", "year": "2024", "type": "Course"}
+
+
+def test_batch_applies_all_operations_in_one_write(client):
+    before = client.get("/api/content/").json()
+    response = client.post("/api/content/batch", json={"operations": [
+        {"op": "add", "section": "education", "item": dict(_education("A"), id="batch-a")},
+        {"op": "add", "section": "education", "item": dict(_education("B"), id="batch-b")},
+        {"op": "update", "section": "education", "id": "batch-a", "item": {"year": "2025"}},
+        {"op": "delete", "section": "education", "id": "batch-b"},
+    ]})
+
+    assert response.status_code == 200
+    assert [result["op"] for result in response.json()["results"]] == ["add", "add", "update", "delete"]
+    after = client.get("/api/content/").json()
+    assert after["version"] == before["version"] + 1
+    added = [item for item in after["education"] if item["id"].startswith("batch-")]
+    assert added == [dict(_education("A"), id="batch-a", year="2025")]
+
+
+def test_failing_operation_saves_nothing(client):
+    before = client.get("/api/content/").json()
+    response = client.post("/api/content/batch", json={"operations": [
+        {"op": "add", "section": "education", "item": _education("C")},
+        {"op": "delete", "section": "education", "id": "no-such-id"},
+    ]})
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["operation"] == 1
+    assert client.get("/api/content/").json()["version"] == before["version"]
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "delete", "section": "education"},
+    {"op": "update", "section": "education", "item": {"year": "1"}},
+    {"op": "update", "section": "education", "id": "x"},
+    {"op": "add", "section": "education"},
+    {"op": "reorder", "section": "education"},
+])
+def test_operations_missing_required_fields_are_rejected(client, operation):
+    response = client.post("/api/content/batch", json={"operations": [operation]})
+    assert response.status_code == 422
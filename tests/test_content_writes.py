@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from json_storage import storage
+
+
+@pytest.fixture
+def malformed_experience():
+    """An experience stored without its required fields (as older versions allowed)"""
+    storage.mutate(lambda content: content["experiences"].append({"id": "malformed"}))
+    yield
+    storage.mutate(lambda content: content.__setitem__(
+        "experiences", [item for item in content["experiences"] if item["id"] != "malformed"]))
+
+
+def test_saved_write_is_not_reported_as_a_bad_request(malformed_experience):
+    import server
+
+    version = storage.get_snapshot()["version"]
+    with TestClient(server.app, raise_server_exceptions=False) as client:
+        put = client.put("/api/content/", json={"aboutDescription": {"en": "put"}})
+        patch = client.patch(
+            "/api/content/", json={"aboutDescription": {"en": "patch"}},
+            headers={"Content-Type": "application/merge-patch+json"})
+
+    # Both were saved; the stored content just cannot be rendered as ContentData
+    assert storage.get_snapshot()["version"] == version + 2
+    assert storage.get_snapshot()["aboutDescription"] == {"en": "patch"}
+    assert put.status_code == patch.status_code == 500
+
+
+@pytest.mark.parametrize("path, section", [("/api/content/experience", "experiences"), ("/api/content/education", "education")])
+def test_added_items_are_validated(client, path, section):
+    before = storage.get_snapshot()
+    response = client.post(path, json={"title": "No other fields"})
+
+    assert response.status_code == 422
+    assert storage.get_snapshot()["version"] == before["version"]
+    assert storage.get_snapshot()[section] == before[section]
+
+
+def test_added_item_is_stored_in_normalized_form(client):
+    experience = {
+        "title": "Engineer", "company": "Co", "location": "Here", "period": "2020",
+        "description": {"en": ["Work"]}, "unknown": "dropped",
+    }
+    response = client.post("/api/content/experience", json=experience)
+
+    assert response.status_code == 200
+    stored = client.get(f"/api/content/experience/{response.json()['id']}").json()
+    assert "unknown" not in stored
+    assert stored["company"] == "Co"
+    client.delete(f"/api/content/experience/{stored['id']}")
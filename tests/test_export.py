@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+
+from json_storage import storage
+
+
+@pytest.fixture
+def admin_client(client):
+    import server
+    from routes.auth import require_admin
+
+    server.app.dependency_overrides[require_admin] = lambda: {"username": "test"}
+    yield client
+    server.app.dependency_overrides.pop(require_admin, None)
+
+
+def _check_envelope(export, filename):
+    data = export["data"]
+    assert export["success"] is True
+    assert export["exported_at"]
+    assert export["records_count"] == {
+        "experiences": len(data["experiences"]),
+        "education": len(data["education"]),
+        "skills_categories": len(data["skills"]),
+        "languages": len(data["languages"]),
+    }
+    assert filename == f'attachment; filename="cv_content_v{data["version"]}.json"'
+
+
+def test_export_envelope_describes_its_body(admin_client):
+    response = admin_client.get("/api/import/export?download=true", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    _check_envelope(response.json(), response.headers["content-disposition"])
+    assert response.json()["data"] == storage.get_snapshot()
+
+
+def test_export_taken_while_a_save_lands(admin_client, monkeypatch):
+    import routes.import_data as import_data
+
+    build = import_data._export_json
+
+    def build_then_save(content):
+        payload = build(content)
+        storage.mutate(lambda current: current["skills"].__setitem__("during export", ["x"]))
+        return payload
+
+    monkeypatch.setattr(import_data, "_export_json", build_then_save)
+    # A new version, so the export is built (and the save lands) now
+    storage.mutate(lambda current: current["skills"].__setitem__("before export", [str(uuid.uuid4())]))
+    response = admin_client.get("/api/import/export?download=true", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"  # decoded by the client
+    export = response.json()
+    _check_envelope(export, response.headers["content-disposition"])
+    assert "during export" not in export["data"]["skills"]
+    assert "during export" in storage.get_snapshot()["skills"]
+    storage.mutate(lambda current: [current["skills"].pop(name) for name in ("before export", "during export")])
+
+
+def test_ndjson_filename_matches_its_version(admin_client):
+    response = admin_client.get("/api/import/export?format=ndjson&download=true")
+    version = storage.get_snapshot()["version"]
+    assert response.headers["content-disposition"] == f'attachment; filename="cv_content_v{version}.ndjson"'
@@ -0,0 +1,57 @@
+import time
+
+HTML = {"Accept": "text/html,application/xhtml+xml,*/*;q=0.8"}
+
+
+def test_unknown_api_path_is_a_json_404(client):
+    for path in ("/api/nope", "/api/content/nope/deeper", "/api/content/experience/x/y"):
+        response = client.get(path, headers=HTML)
+        assert response.status_code == 404
+        assert response.headers["content-type"].startswith("application/json")
+
+
+def test_404_raised_by_a_route_passes_through(client):
+    response = client.get("/api/content/experience/no-such-id", headers=HTML)
+    assert response.status_code == 404
+    assert "no-such-id" in response.json()["detail"]
+
+
+def test_page_urls_get_the_spa(client):
+    response = client.get("/some/client/route", headers=HTML)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert "window.__CV_DATA__" in response.text
+
+
+def test_admin_urls_get_the_admin_page(client):
+    response = client.get("/admin/settings", headers=HTML)
+    assert response.status_code == 200
+    assert response.text == client.get("/admin").text
+
+
+def test_non_html_requests_are_not_answered_with_the_spa(client):
+    assert client.get("/some/client/route", headers={"Accept": "application/json"}).status_code == 404
+    assert client.post("/some/client/route", headers=HTML).status_code == 404
+    assert client.get("/static/js/missing.js", headers=HTML).status_code == 404
+
+
+def test_build_files_are_served(client):
+    response = client.get("/index.html")
+    assert response.status_code == 200
+    assert response.headers["etag"]
+
+
+def test_dispatch_overhead(client):
+    """Time per request for a routed API call and an unmatched API path"""
+    def mean_time(path, rounds=300):
+        client.get(path)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            client.get(path)
+        return (time.perf_counter() - start) / rounds
+
+    routed = mean_time("/api/")
+    unmatched = mean_time("/api/does-not-exist")
+    print(f"routed: {routed * 1e6:.0f} us, unmatched 404: {unmatched * 1e6:.0f} us")
+    # An unmatched path costs about as much as a routed one, not a full page render
+    assert unmatched < routed * 3
@@ -0,0 +1,235 @@
+import asyncio
+import json
+import tempfile
+import tracemalloc
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+MB = 1024 * 1024
+
+
+def _cv_document(experiences):
+    """A valid import with enough experiences to weigh a few MB"""
+    return {
+        "personalInfo": {
+            "name": "Test", "title": "Engineer", "phone": "0", "email": "t@example.com",
+            "website": "example.com", "profileImage": "",
+        },
+        "experiences": [
+            {
+                "id": f"exp-{i}",
+                "title": f"Role {i}",
+                "company": "Company",
+                "location": "Somewhere",
+                "period": "2020 - 2021",
+                "description": {"en": ["Did things " * 20, "More things " * 20]},
+            }
+            for i in range(experiences)
+        ],
+        "education": [],
+        "skills": {"Languages": ["Python"]},
+        "languages": [{"name": "English", "level": "Native", "proficiency": 100}],
+        "aboutDescription": {"en": "About"},
+    }
+
+
+def _upload(body, size=None):
+    """An UploadFile spooled to disk, as Starlette leaves a large upload"""
+    spooled = tempfile.SpooledTemporaryFile()
+    spooled.rollover()
+    spooled.write(body)
+    spooled.seek(0)
+    return UploadFile(file=spooled, size=size, filename="cv.json")
+
+
+def _peak_memory(coroutine):
+    """Run coroutine, returning (result or exception, peak traced bytes)"""
+    tracemalloc.start()
+    try:
+        try:
+            result = asyncio.run(coroutine)
+        except Exception as e:
+            result = e
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+@pytest.fixture
+def admin_client(client):
+    import server
+    from routes.auth import require_admin
+
+    server.app.dependency_overrides[require_admin] = lambda: {"username": "test"}
+    yield client
+    server.app.dependency_overrides.pop(require_admin, None)
+
+
+@pytest.fixture
+def import_data(monkeypatch, tmp_path):
+    """routes.import_data with its storage swapped for one over tmp_path"""
+    import routes.import_data as import_data
+    from json_storage import AsyncJSONStorage, JSONStorage
+
+    monkeypatch.setattr(import_data, "storage", AsyncJSONStorage(JSONStorage(str(tmp_path))))
+    return import_data
+
+
+def test_oversized_upload_is_rejected_with_413(admin_client, monkeypatch):
+    import routes.import_data as import_data
+
+    monkeypatch.setattr(import_data, "MAX_IMPORT_BYTES", 2 * MB)
+    body = b" " * (8 * MB)
+    response = admin_client.post(
+        "/api/import/cv-data", files={"file": ("cv.json", body, "application/json")})
+    assert response.status_code == 413
+
+
+def test_oversized_upload_of_unknown_size_stops_reading_at_the_limit(import_data, monkeypatch):
+    limit = 2 * MB
+    monkeypatch.setattr(import_data, "MAX_IMPORT_BYTES", limit)
+    upload = _upload(b" " * (16 * MB))
+
+    result, peak = _peak_memory(import_data.import_cv_data(upload, dry_run=True, current_user={}))
+
+    assert isinstance(result, HTTPException) and result.status_code == 413
+    # Reading stops at the limit, and only the chunk being parsed is held
+    assert upload.file.tell() <= limit + import_data.IMPORT_CHUNK_SIZE
+    print(f"413 peak: {peak / MB:.1f} MB for a 16 MB upload")
+    assert peak < 8 * import_data.IMPORT_CHUNK_SIZE
+
+
+def test_multi_mb_import_is_parsed_without_whole_file_copies(import_data):
+    body = json.dumps(_cv_document(7000)).encode("utf-8")
+    assert len(body) > 4 * MB
+    upload = _upload(body)
+
+    tracemalloc.start()
+    try:
+        json.loads(body)
+        _, whole_file_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        content = import_data._parse_upload(upload.file, import_data.MAX_IMPORT_BYTES)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    peak -= baseline
+
+    assert len(content["experiences"]) == 7000
+    print(f"parse peak: {peak / MB:.1f} MB (json.loads: {whole_file_peak / MB:.1f} MB) "
+          f"for a {len(body) / MB:.1f} MB upload")
+    # The parsed document plus one chunk: no bytes or str copy of the file
+    assert peak < whole_file_peak
+    assert peak < 3 * len(body)
+
+
+def test_multi_mb_import_peak_memory(import_data):
+    body = json.dumps(_cv_document(7000)).encode("utf-8")
+
+    result, peak = _peak_memory(
+        import_data.import_cv_data(_upload(body, size=len(body)), dry_run=False, current_user={}))
+
+    assert not isinstance(result, Exception), result
+    assert result["records_count"]["experiences"] == 7000
+    print(f"import peak: {peak / MB:.1f} MB for a {len(body) / MB:.1f} MB upload")
+    # The parsed document (under 3x), then the save: the indented file as
+    # str and bytes and the cache's copy of the document
+    assert peak < 8 * len(body)
+
+
+def test_first_schema_violation_stops_the_import(import_data):
+    document = _cv_document(7000)
+    del document["experiences"][1]["company"]
+    document["experiences"][5000]["title"] = None
+    body = json.dumps(document).encode("utf-8")
+    upload = _upload(body, size=len(body))
+
+    with pytest.raises(import_data.ContentValidationError) as error:
+        import_data._parse_upload(upload.file, import_data.MAX_IMPORT_BYTES)
+
+    assert error.value.messages == ["experiences.1.company: Field required"]
+    # Rejected after the first chunk, not at the end of the file
+    assert upload.file.tell() <= import_data.IMPORT_CHUNK_SIZE
+
+
+def test_schema_errors_are_reported_with_422(admin_client):
+    document = _cv_document(3)
+    del document["experiences"][1]["company"]
+    response = admin_client.post(
+        "/api/import/cv-data",
+        files={"file": ("cv.json", json.dumps(document).encode("utf-8"), "application/json")})
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["error_count"] == 1
+    assert detail["errors"] == ["experiences.1.company: Field required"]
+
+
+def test_missing_fields_are_reported_together(admin_client):
+    document = _cv_document(1)
+    del document["skills"], document["languages"]
+    response = admin_client.post(
+        "/api/import/cv-data",
+        files={"file": ("cv.json", json.dumps(document).encode("utf-8"), "application/json")})
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"] == ["skills: Field required", "languages: Field required"]
+
+
+@pytest.mark.parametrize("body", [b'{"skills": {', b'{"skills": {}} trailing', b"[1, 2]", b"\xff\xfe"])
+def test_malformed_files_are_rejected_with_400(admin_client, body):
+    response = admin_client.post(
+        "/api/import/cv-data", files={"file": ("cv.json", body, "application/json")})
+    assert response.status_code == 400
+
+
+def test_streamed_import_matches_validate_content(import_data, monkeypatch):
+    from models.content import validate_content
+
+    document = _cv_document(3)
+    document["unknown"] = {"nested": [1, 2, {"deep": True}]}
+    document["version"] = 7
+    body = json.dumps(document, indent=2).encode("utf-8")
+
+    # Chunks small enough to split strings, numbers and literals
+    monkeypatch.setattr(import_data, "IMPORT_CHUNK_SIZE", 7)
+    streamed = import_data._parse_upload(_upload(body).file, import_data.MAX_IMPORT_BYTES)
+
+    expected = validate_content(json.loads(body))
+    streamed["id"] = expected["id"]
+    assert streamed == expected
+
+
+def test_duplicate_ids_are_all_reported_with_422(admin_client):
+    document = _cv_document(4)
+    for index in (1, 3):
+        document["experiences"][index]["id"] = "exp-0"
+    document["education"] = [
+        {"id": "edu", "title": "T", "institution": "I", "year": "2000", "type": "degree"},
+        {"id": "edu", "title": "T", "institution": "I", "year": "2001", "type": "degree"},
+    ]
+    response = admin_client.post(
+        "/api/import/cv-data",
+        files={"file": ("cv.json", json.dumps(document).encode("utf-8"), "application/json")})
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["error_count"] == 3
+    assert detail["errors"] == [
+        "experiences.1.id: Duplicate id exp-0",
+        "experiences.3.id: Duplicate id exp-0",
+        "education.1.id: Duplicate id edu",
+    ]
+
+
+def test_validate_content_reports_duplicates_like_other_schema_errors():
+    from models.content import ContentValidationError, format_validation_errors, validate_content
+
+    document = _cv_document(2)
+    document["experiences"][1]["id"] = "exp-0"
+    with pytest.raises(ContentValidationError) as error:
+        validate_content(document)
+    assert format_validation_errors(error.value) == ["experiences.1.id: Duplicate id exp-0"]
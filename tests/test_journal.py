@@ -0,0 +1,136 @@
+import json
+
+
+def _add_skill(storage, name):
+    return storage.mutate(lambda content: content["skills"].__setitem__(name, [name]))
+
+
+def test_replay_after_restart(make_storage):
+    storage = make_storage(journal=True)
+    for name in ("a", "b", "c"):
+        _add_skill(storage, name)
+    version = storage.get_snapshot()["version"]
+
+    # Edits live in the journal until compaction
+    assert len(storage.journal_file.read_text().splitlines()) == 3
+
+    restarted = make_storage(journal=True)
+    content = restarted.get_snapshot()
+    assert content["version"] == version
+    assert {"a", "b", "c"} <= set(content["skills"])
+
+
+def test_compaction_folds_journal_and_keeps_history(make_storage):
+    storage = make_storage(journal=True)
+    versions = [_add_skill(storage, name)["version"] for name in ("a", "b")]
+
+    storage.compact_journal()
+
+    assert not storage.journal_file.exists()
+    on_disk = json.loads(storage.content_file.read_text())
+    assert on_disk["version"] == versions[-1]
+    assert {"a", "b"} <= set(on_disk["skills"])
+    # The replaced snapshot and the intermediate revision are archived
+    archived = {entry["version"] for entry in storage.get_backup_history()}
+    assert versions[0] in archived
+    assert versions[0] - 1 in archived
+
+
+def test_compaction_is_scheduled_past_max_entries(make_storage):
+    storage = make_storage(journal=True, journal_max_entries=2)
+    _add_skill(storage, "a")
+    _add_skill(storage, "b")
+    storage.compact_journal()  # waits for the background one via write_lock
+
+    assert not storage.journal_file.exists()
+    assert {"a", "b"} <= set(make_storage(journal=True).get_snapshot()["skills"])
+
+
+def test_torn_record_does_not_swallow_later_writes(make_storage):
+    storage = make_storage(journal=True)
+    _add_skill(storage, "before")
+
+    # A crash in the middle of an append
+    with open(storage.journal_file, "ab") as f:
+        f.write(b'{"rev": 99, "ops": [')
+
+    restarted = make_storage(journal=True)
+    saved = restarted.update_content({"aboutDescription": {"en": "after the crash"}})
+
+    # The write survives a restart...
+    content = make_storage(journal=True).get_snapshot()
+    assert content["version"] == saved["version"]
+    assert content["aboutDescription"] == {"en": "after the crash"}
+    assert "before" in content["skills"]
+
+    # ...and compaction
+    again = make_storage(journal=True)
+    again.compact_journal()
+    on_disk = json.loads(again.content_file.read_text())
+    assert on_disk["aboutDescription"] == {"en": "after the crash"}
+    assert on_disk["version"] == saved["version"]
+
+
+def _append_bad_record(storage, rev):
+    """A record whose first operation applies and whose second one fails"""
+    record = {"rev": rev, "ts": "", "ops": [
+        {"op": "replace", "path": "/aboutDescription", "value": {"en": "half applied"}},
+        {"op": "remove", "path": "/no-such-field"},
+    ]}
+    with open(storage.journal_file, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def test_record_that_fails_part_way_is_not_half_applied(make_storage):
+    storage = make_storage(journal=True)
+    version = _add_skill(storage, "a")["version"]
+    _append_bad_record(storage, version + 1)
+
+    content = make_storage(journal=True).get_snapshot()
+    assert content["version"] == version
+    assert content["aboutDescription"] != {"en": "half applied"}
+
+    compacted = make_storage(journal=True)
+    compacted.compact_journal()
+    on_disk = json.loads(compacted.content_file.read_text())
+    assert on_disk["version"] == version
+    assert on_disk["aboutDescription"] != {"en": "half applied"}
+
+
+def test_writes_after_a_bad_record_are_not_lost(make_storage):
+    storage = make_storage(journal=True)
+    _add_skill(storage, "a")
+    version = _add_skill(storage, "b")["version"]
+    _append_bad_record(storage, version + 1)
+
+    restarted = make_storage(journal=True)
+    assert restarted.get_snapshot()["version"] == version
+    saved = [_add_skill(restarted, name)["version"] for name in ("c", "d")]
+    assert saved == [version + 1, version + 2]
+
+    content = make_storage(journal=True).get_snapshot()
+    assert content["version"] == version + 2
+    assert {"a", "b", "c", "d"} <= set(content["skills"])
+    assert content["aboutDescription"] != {"en": "half applied"}
+
+
+def test_writes_after_an_unreadable_line_are_not_lost(make_storage):
+    storage = make_storage(journal=True)
+    version = _add_skill(storage, "a")["version"]
+    with open(storage.journal_file, "a") as f:
+        f.write("not json\n")
+
+    saved = _add_skill(make_storage(journal=True), "b")["version"]
+
+    content = make_storage(journal=True).get_snapshot()
+    assert content["version"] == saved == version + 1
+    assert {"a", "b"} <= set(content["skills"])
+
+
+def test_leftover_journal_is_folded_in_when_journal_mode_is_off(make_storage):
+    storage = make_storage(journal=True)
+    version = _add_skill(storage, "a")["version"]
+
+    plain = make_storage(journal=False)
+    assert not plain.journal_file.exists()
+    assert plain.get_snapshot()["version"] == version
@@ -0,0 +1,52 @@
+import io
+import json
+
+import pytest
+
+from json_stream import JSONStreamError, JSONStreamReader, StreamTooLarge
+
+DOCUMENT = {"a": [1, -2.5e3, True, None, "snöw ☃"], "b": {"c": 12345678901234567890}, "d": []}
+
+
+def _reader(text, chunk_size=3, **kwargs):
+    return JSONStreamReader(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size, **kwargs)
+
+
+def _read_all(reader):
+    """Rebuild a document member by member"""
+    if reader.peek() == "{":
+        return {key: _read_all(reader) for key in reader.iter_object()}
+    if reader.peek() == "[":
+        return [_read_all(reader) for _ in reader.iter_array()]
+    return reader.read_value()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64 * 1024])
+def test_values_split_across_chunks(chunk_size):
+    reader = _reader(json.dumps(DOCUMENT, ensure_ascii=False), chunk_size)
+    assert _read_all(reader) == DOCUMENT
+    reader.end()
+
+
+def test_skip_value_reads_past_nested_members():
+    reader = _reader('{"skip": {"x": [1, {"y": "}"}]}, "keep": 1}')
+    keys = iter(reader.iter_object())
+    assert next(keys) == "skip"
+    reader.skip_value()
+    assert next(keys) == "keep"
+    assert reader.read_value() == 1
+
+
+@pytest.mark.parametrize("text", ['{"a": 1', '{"a" 1}', '{"a": 1,}', '[1 2]', '{"a": tru}', '{} {}', ''])
+def test_malformed_documents_raise(text):
+    with pytest.raises(JSONStreamError):
+        reader = _reader(text)
+        _read_all(reader)
+        reader.end()
+
+
+def test_limit_stops_reading():
+    reader = _reader(json.dumps(["x" * 100] * 100), chunk_size=64, limit=1000)
+    with pytest.raises(StreamTooLarge):
+        _read_all(reader)
+    assert reader.bytes_read <= 1000 + 64
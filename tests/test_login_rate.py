@@ -0,0 +1,76 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def fresh_limiters(monkeypatch):
+    """Empty login rate limiters, so tests do not share buckets"""
+    import routes.auth as auth
+    from rate_limit import TokenBucketLimiter
+
+    for name in ("ip_limiter", "username_limiter"):
+        old = getattr(auth, name)
+        monkeypatch.setattr(auth, name, TokenBucketLimiter(old.capacity, old.refill_per_second))
+    return auth
+
+
+def test_login_burst_then_429(client, fresh_limiters):
+    credentials = {"username": "nobody", "password": "wrong"}
+    statuses = [client.post("/api/auth/login", json=credentials).status_code for _ in range(7)]
+
+    burst = int(fresh_limiters.ip_limiter.capacity)
+    assert statuses[:burst] == [401] * burst
+    assert statuses[burst:] == [429] * (len(statuses) - burst)
+    response = client.post("/api/auth/login", json=credentials)
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_public_get_latency_during_login_flood(fresh_limiters, monkeypatch):
+    """p99 of GET /api/content/ while password checks run stays far below a hash's cost"""
+    import server
+
+    # Each flooding client comes from its own address, so every attempt
+    # gets past the rate limit and pays for a password check
+    monkeypatch.setenv("TRUST_PROXY", "1")
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            await http.get("/api/content/")
+            stop = asyncio.Event()
+            latencies = []
+            attempts = []
+
+            async def flood(worker):
+                index = 0
+                while not stop.is_set():
+                    response = await http.post(
+                        "/api/auth/login",
+                        json={"username": f"user-{worker}-{index}", "password": "wrong"},
+                        headers={"X-Forwarded-For": f"10.0.{worker}.{index % 250}"})
+                    attempts.append(response.status_code)
+                    index += 1
+
+            async def reader():
+                for _ in range(100):
+                    start = time.perf_counter()
+                    response = await http.get("/api/content/")
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200
+                    await asyncio.sleep(0.001)
+
+            flooders = [asyncio.create_task(flood(worker)) for worker in range(8)]
+            await asyncio.gather(*(reader() for _ in range(4)))
+            stop.set()
+            await asyncio.gather(*flooders)
+            return latencies, attempts
+
+    latencies, attempts = asyncio.run(run())
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(f"GET p99 during a login flood: {p99 * 1000:.2f} ms, {len(attempts)} login attempts")
+    assert attempts and set(attempts) == {401}
+    assert p99 < 0.25
@@ -0,0 +1,109 @@
+import json
+import threading
+import uuid
+
+import pytest
+
+from json_storage import PreconditionFailed, storage
+
+
+def _about(text):
+    return {"aboutDescription": {"en": text, "es": text, "fr": text}}
+
+
+def test_write_returns_etag_of_its_own_version(client):
+    etag = client.get("/api/content/").headers["etag"]
+
+    response = client.put("/api/content/", json=_about(str(uuid.uuid4())), headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.headers["etag"] == client.get("/api/content/").headers["etag"]
+
+
+def test_stale_if_match_is_rejected(client):
+    etag = client.get("/api/content/").headers["etag"]
+    assert client.put("/api/content/", json=_about(str(uuid.uuid4())), headers={"If-Match": etag}).status_code == 200
+
+    response = client.put("/api/content/", json=_about(str(uuid.uuid4())), headers={"If-Match": etag})
+
+    assert response.status_code == 412
+
+
+def test_etag_from_a_write_does_not_cover_a_later_write(client):
+    response = client.put("/api/content/", json=_about(str(uuid.uuid4())))
+    mine = response.headers["etag"]
+
+    # Another writer saves right after
+    storage.update_content(_about("someone else"))
+
+    response = client.put("/api/content/", json=_about("mine"), headers={"If-Match": mine})
+    assert response.status_code == 412
+    assert storage.get_snapshot()["aboutDescription"]["en"] == "someone else"
+
+
+def test_item_endpoints_check_if_match(client):
+    experience_id = client.get("/api/content/").json()["experiences"][0]["id"]
+    patch = json.dumps({"location": str(uuid.uuid4())})
+    headers = {"Content-Type": "application/merge-patch+json", "If-Match": '"stale"'}
+
+    assert client.patch(f"/api/content/experience/{experience_id}", content=patch, headers=headers).status_code == 412
+    assert client.delete(f"/api/content/experience/{experience_id}", headers={"If-Match": '"stale"'}).status_code == 412
+
+
+def test_duplicate_item_id_is_a_conflict(client):
+    item = {"id": str(uuid.uuid4()), "title": "T", "institution": "I", "year": "2024", "type": "Course"}
+
+    assert client.post("/api/content/education", json=item).status_code == 200
+    assert client.post("/api/content/education", json=item).status_code == 409
+
+
+def test_failed_patch_test_operation_is_a_conflict(client):
+    patch = json.dumps([{"op": "test", "path": "/personalInfo/name", "value": "Nobody"}])
+    response = client.patch("/api/content/", content=patch, headers={"Content-Type": "application/json-patch+json"})
+    assert response.status_code == 409
+
+
+def test_check_precondition(make_storage):
+    local = make_storage()
+    etag = local.current_etag()
+
+    local.check_precondition(None)
+    local.check_precondition("*")
+    local.check_precondition(etag)
+    local.update_content(_about("changed"))
+    with pytest.raises(PreconditionFailed):
+        local.check_precondition(etag)
+
+
+def test_reader_of_a_corrupt_file_does_not_deadlock_a_writer(make_storage):
+    make_storage()
+    local = make_storage()  # nothing cached yet
+    local.content_file.write_text("{ not json")
+    lock_held = threading.Event()
+    reader_started = threading.Event()
+
+    def writer():
+        with local.write_lock:
+            lock_held.set()
+            reader_started.wait(5)
+            # Give the reader time to get stuck behind write_lock
+            threading.Event().wait(0.2)
+            local.get_snapshot()
+
+    def reader():
+        reader_started.set()
+        local.get_snapshot()
+
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    writer_thread.start()
+    assert lock_held.wait(5)
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    reader_thread.start()
+
+    writer_thread.join(5)
+    reader_thread.join(5)
+    assert not writer_thread.is_alive() and not reader_thread.is_alive()
+    # The broken file was set aside and replaced by the default content
+    assert list(local.data_dir.glob("cv_content.corrupt_*.json"))
+    assert local.get_snapshot()["experiences"]
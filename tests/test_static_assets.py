@@ -0,0 +1,37 @@
+from static_assets import IMMUTABLE_CACHE_CONTROL, PAGE_CACHE_CONTROL, StaticAssets
+
+
+def _build(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "static" / "js" / "main.abc123.js").write_text("console.log(1)")
+    (tmp_path / "index.html").write_text("<html></html>")
+    return StaticAssets(tmp_path)
+
+
+def test_spellings_of_one_file_share_a_cache_entry(tmp_path):
+    assets = _build(tmp_path)
+    entries = len(assets._assets)
+
+    first = assets.get("static/js/main.abc123.js")
+    for spelling in ("/static/js//main.abc123.js", "static/js///main.abc123.js",
+                     "static/./js/main.abc123.js", "static/js/../js/main.abc123.js"):
+        assert assets.get(spelling) is first
+    assert len(assets._assets) == entries
+
+
+def test_paths_outside_the_build_are_refused(tmp_path):
+    assets = _build(tmp_path / "build")
+    (tmp_path / "secret.txt").write_text("no")
+    assert assets.get("../secret.txt") is None
+
+
+def test_cache_control_follows_the_resolved_path(tmp_path):
+    from fastapi import Request
+
+    assets = _build(tmp_path)
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+
+    for spelling in ("static/js/main.abc123.js", "/static//js/main.abc123.js", "./static/js/main.abc123.js"):
+        assert assets.response(request, spelling).headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    # Spelled with static/ but resolving outside it
+    assert assets.response(request, "static/../index.html").headers["cache-control"] == PAGE_CACHE_CONTROL